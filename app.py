@@ -1,238 +1,202 @@
 import os
-import tempfile
 from flask import Flask, request, render_template, send_file
-import pdfplumber
-import docx
-import re
-import openpyxl
 from datetime import datetime
-from difflib import SequenceMatcher
-
-# Mapping country names to nationalities
-country_to_nationality = {
-    "United States": "American", "USA": "American", "India": "Indian", "Canada": "Canadian",
-    "United Kingdom": "British", "UK": "British", "Australia": "Australian", "Germany": "German",
-    "France": "French", "Spain": "Spanish", "Italy": "Italian", "China": "Chinese", "Japan": "Japanese",
-    "South Korea": "Korean", "Brazil": "Brazilian", "Mexico": "Mexican", "Russia": "Russian",
-    "Netherlands": "Dutch", "Turkey": "Turkish", "Sweden": "Swedish", "Norway": "Norwegian",
-    "Denmark": "Danish", "Finland": "Finnish", "Switzerland": "Swiss", "South Africa": "South African",
-    "Argentina": "Argentinian", "Egypt": "Egyptian", "Saudi Arabia": "Saudi", 
-    "United Arab Emirates": "Emirati", "UAE": "Emirati"
-}
-
-
-# Define a list of common job title keywords
-job_keywords = [
-    "Manager", "Engineer", "Developer", "Doctor", "Consultant", "Coordinator",
-    "Specialist", "Analyst", "Nurse", "Architect", "Technician", "Lead", "Director", "Executive", "Trainer", "Scientist",
-    "Assistant", "Supervisor", "Administrator", "Clerk", "Operator", "Officer", "Designer", "Trainer", "Technologist",
-    "Chef", "Sales", "Accountant", "Business Analyst", "Project Manager", "Program Manager", "Product Manager", "Legal Advisor",
-    "Social Worker", "Researcher", "Marketing", "HR", "Director", "Chief", "Chief Executive Officer", "CFO", "COO", "CTO",
-    "Software Engineer", "Web Developer", "Data Scientist", "System Analyst", "IT Manager", "Business Development", "Chief Marketing Officer",
-    "UX Designer", "Product Designer", "Data Analyst", "Business Development Manager", "Digital Marketing", "Account Executive",
-    "Financial Analyst", "Security Specialist", "HR Manager", "Operations Manager", "Quality Analyst", "Risk Manager", "IT Specialist",
-    "Sales Manager", "Customer Support", "Logistics Manager", "Project Coordinator", "Public Relations", "Copywriter", "Content Writer",
-    "Photographer", "Videographer", "Consulting Analyst", "Security Consultant", "Healthcare Consultant", "Marketing Consultant",
-    "SEO Specialist", "UX/UI Designer", "Event Coordinator", "Facilities Manager", "Office Manager", "Customer Service Representative",
-    "Research Analyst", "Teacher", "Instructor", "Professor", "Lecturer", "Academic Advisor", "Instructional Designer", "Counselor",
-    "Chief Information Officer", "Software Developer", "Field Engineer", "Maintenance Engineer", "Systems Administrator", "Network Engineer",
-    "Recruiter", "Event Planner", "Data Entry", "Technician", "Help Desk", "Support Engineer", "Financial Controller", "Health Educator",
-    "Project Director", "Creative Director", "Brand Manager", "Talent Manager", "Business Partner", "Product Specialist", "SEO Manager"
-]
-
-
-
-
+from functools import partial
+from resume_parser import FIELDS, parse_fields, process_resume, finish_rows, create_excel
+from ranking import query_terms
+from dedupe import DuplicateIndex
+from scheduler import FairScheduler, SchedulerError
+from workqueue import SQLiteQueue, QueueScheduler
+from journal import JobJournal
+from artifacts import ArtifactStore
+from profiling import profiling_requested, profiled_call, profile_request, merge_profiles
+from contextlib import nullcontext
+import shutil
+import threading
+import uuid
 
 app = Flask(__name__)
 
-# Use a temporary directory for file uploads
-UPLOAD_FOLDER = tempfile.mkdtemp()
+# Uploads and results are kept per job in a persistent folder so jobs survive a restart
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs')
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-# Words to ignore in filename
-IGNORE_WORDS = {'resume', 'cv', 'curriculum', 'vitae', 'application', 'letter'}  # Add more as needed
-
-
-
-def clean_filename(file_name):
-    """
-    Removes ignored words and numbers from the filename.
-    Returns the cleaned name if it contains more than 3 letters.
-    """
-    words = re.split(r'[\s\W_]+', file_name)  # Split by space, special characters, and underscores
-    cleaned_words = [word for word in words if word.lower() not in IGNORE_WORDS and not word.isdigit()]
-    cleaned_name = " ".join(cleaned_words)  # Rejoin the words
-    return cleaned_name if len(cleaned_name) > 3 else None
-
-def name_similarity(extracted_name, file_name):
-    """
-    Compares the extracted name with the filename based on multiple conditions.
-    If the similarity score is greater than 0.5, return extracted_name.
-    If filename contains extracted_name or vice versa, return extracted_name.
-    If the extracted name contains any numbers, return the file name.
-    If the file name appears in the entire file content, return the filename.
-    Otherwise, return "Not Found".
-    """
-    if not extracted_name and not file_name:
-        return "Not Found"  # Return "Not Found" if both name and file name are missing
-
-    file_name_base = os.path.splitext(file_name)[0]  # Remove file extension
-    file_name_cleaned = clean_filename(file_name_base)  # Clean filename
-
-    # 1. If extracted_name contains any number, return file_name
-    if re.search(r'\d', extracted_name):  # If extracted_name contains a digit
-        return file_name_cleaned
-
-    # 2. Compare extracted_name and file_name similarity score
-    similarity_score = SequenceMatcher(None, extracted_name.lower(), file_name_base.lower()).ratio()
-    if similarity_score > 0.5:
-        return extracted_name
-
-    # 3. Check if file_name contains extracted_name or extracted_name contains file_name
-    if extracted_name.lower() in file_name_base.lower() or file_name_base.lower() in extracted_name.lower():
-        return extracted_name
-
-    # 4. Check if the entire file contains the file_name (use the cleaned version for comparison)
-    if file_name_cleaned and file_name_cleaned in extracted_name.lower():
-        return file_name_cleaned
-
-    # 5. If none of the above, return extracted_name (default behavior)
-    return extracted_name
-
-# Function to extract email
-def extract_email(text):
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    email = re.findall(email_pattern, text)
-    return email[0] if email else "Not Found"
-
-# Function to extract phone number
-def extract_phone(text):
-    phone_pattern = r'\+?\d{1,3}[-.\s]?\d{1,4}[-.\s]?\d{2,4}[-.\s]?\d{2,4}[-.\s]?\d{2,4}'
-    phone_matches = re.findall(phone_pattern, text)
-    if phone_matches:
-        clean_phone = re.sub(r'\D', '', phone_matches[0])  # Remove non-digit characters
-        if len(clean_phone) > 14:
-            return "Not Found"
-        return phone_matches[0]
-    return "Not Found"
-
-# Function to extract name (assuming it is in the first non-empty line)
-def extract_name(text):
-    lines = text.splitlines()
-    for line in lines:
-        if line.strip():
-            return line.strip()
-    return None
-
-# Function to extract nationality based on country mention
-def extract_nationality(text):
-    found_countries = []
-    for country, nationality in country_to_nationality.items():
-        if re.search(rf'\b{country}\b', text, re.IGNORECASE):
-            found_countries.append(nationality)
-
-    nationality_match = re.search(r'Nationality[:\-]?\s*(\w+)', text, re.IGNORECASE)
-    if nationality_match:
-        return nationality_match.group(1).capitalize()
-
-    if len(found_countries) > 1:
-        return ", ".join(set(found_countries))
-
-    return found_countries[0] if found_countries else "Not Found"
-
-def extract_designation_simple(text):
-    """
-    Extracts job titles/designations from the given text using predefined job-related keywords.
-    """
-    # Use regex to find occurrences of job keywords in the text
-    pattern = r'\b(?:' + '|'.join(job_keywords) + r')\b'
-    job_titles = re.findall(pattern, text, re.IGNORECASE)
-    
-    # Remove duplicates by converting to a set and back to a list
-    job_titles = list(set([title.capitalize() for title in job_titles]))
-    
-    # If no job title is found, return "Not Found"
-    if job_titles:
-        return ", ".join(job_titles)
-    return "Not Found"
-
-# Function to read PDF file
-def read_pdf(file_path):
-    with pdfplumber.open(file_path) as pdf:
-        text = ''.join(page.extract_text() for page in pdf.pages if page.extract_text())
-    return text
-
-# Function to read DOCX file
-def read_docx(file_path):
-    doc = docx.Document(file_path)
-    return '\n'.join(para.text for para in doc.paragraphs)
-
-# Function to process a single resume and extract data
-def process_resume(file_path):
-    file_name = os.path.basename(file_path)  # Get filename with extension
-
-    # Read the file and extract text
-    text = ''
-    if file_path.endswith('.pdf'):
-        text = read_pdf(file_path)
-    elif file_path.endswith('.docx'):
-        text = read_docx(file_path)
-    else:
-        print(f"Unsupported file type: {file_path}")
-        return []
-
-    # Extract details
-    extracted_name = extract_name(text)
-    email = extract_email(text)
-    phone = extract_phone(text)
-    nationality = extract_nationality(text)
-    designation = extract_designation_simple(text)  # Extract the designation/job title
-
-    # Determine final name based on similarity logic
-    final_name = name_similarity(extracted_name, file_name)
-
-    # Return extracted data
-    return [(final_name, email, phone, nationality, designation)]
-
-# Function to create and save data into an Excel file
-def create_excel(data, output_file):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Resume Data"
-
-    headers = ["Name", "Email", "Phone Number", "Nationality", "Designation"]
-    ws.append(headers)
-    for row in data:
-        ws.append(row)
-
-    wb.save(output_file)
+# Journal recording each file's extracted rows as soon as it is processed
+journal = JobJournal(os.path.join(UPLOAD_FOLDER, 'journal.db'))
+
+# Finished job folders are deleted after RESULT_RETENTION_HOURS, oldest first beyond DISK_QUOTA_MB
+artifacts = ArtifactStore(UPLOAD_FOLDER, journal)
+
+# Archive-wide near-duplicate detection; every processed resume is added to the LSH index
+DETECT_DUPLICATES = os.getenv("DETECT_DUPLICATES", "1") == "1"
+duplicate_index = DuplicateIndex(os.path.join(UPLOAD_FOLDER, 'duplicates.db')) if DETECT_DUPLICATES else None
+
+# Uploads from all users share one pool; users are served round-robin with a per-user cap
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", os.cpu_count() or 1))
+PER_USER_CONCURRENCY = int(os.getenv("PER_USER_CONCURRENCY", max(1, SCHEDULER_WORKERS // 2)))
+# WORK_QUEUE=sqlite hands files to separate worker processes (worker.py) through a queue in the
+# jobs folder instead, so capacity grows with the number of workers, on this host or others
+WORK_QUEUE = os.getenv("WORK_QUEUE", "local")
+if WORK_QUEUE == "sqlite":
+    scheduler = QueueScheduler(SQLiteQueue(os.getenv("QUEUE_DB") or os.path.join(UPLOAD_FOLDER, 'queue.db')))
+else:
+    scheduler = FairScheduler(SCHEDULER_WORKERS, per_user_limit=PER_USER_CONCURRENCY)
+
+# Function to run the unfinished files of a journaled job and write its Excel file
+def run_job(job_id, user, profile_dir=None):
+    job = journal.get_job(job_id)
+    fields = job['fields']
+    terms = query_terms(job['job_description']) if job['job_description'] else None
+    pending = journal.pending_files(job_id)
+    positions = [position for position, _ in pending]
+
+    def on_result(index, resume_data):
+        journal.record_result(job_id, positions[index], resume_data)
+
+    def on_error(index, error):
+        print(f"Failed to process {pending[index][1]}: {error}")
+        # Only an error raised by the extraction is final; after a pool or queue failure the
+        # file stays pending, so resuming the job retries it
+        if not isinstance(error, SchedulerError):
+            journal.record_failure(job_id, positions[index], error)
+
+    func = partial(process_resume, fields=fields, terms=terms, minhash=DETECT_DUPLICATES)
+    if profile_dir:
+        # Each worker call saves its own stats, merged with the request's once the job is done
+        func = partial(profiled_call, func, profile_dir)
+
+    # Process files through the shared scheduler so other users' batches are interleaved
+    batch = scheduler.submit(user, func, [file_path for _, file_path in pending],
+                             on_result=on_result, on_error=on_error)
+    batch.done.wait()
+
+    # Save extracted data into Excel, in upload order or best match first when ranking
+    rows = finish_rows(journal.keyed_rows(job_id), terms, duplicate_index)
+    output_file = os.path.join(app.config['UPLOAD_FOLDER'], job_id, f'resumedata_{job_id}.xlsx')
+    create_excel(rows, output_file, fields, ranked=bool(terms), duplicates=DETECT_DUPLICATES)
+    journal.finish_job(job_id, output_file)
+    return output_file
+
+# Jobs of this process whose profile has not been merged yet
+profiled_jobs = set()
+
+# Function to run a job in the background, profiled when the upload asked for it
+def process_job(job_id, user, profile_dir=None):
+    if profile_dir:
+        profiled_jobs.add(job_id)
+    try:
+        with profile_request(profile_dir) if profile_dir else nullcontext():
+            run_job(job_id, user, profile_dir)
+    except Exception as error:
+        print(f"Job {job_id} failed: {error}")
+        journal.fail_job(job_id)
+    finally:
+        # A failed job's profile is merged too, so the profile folder never outlives the job
+        if profile_dir:
+            try:
+                merge_profiles(profile_dir, os.path.join(artifacts.job_folder(job_id), 'profile.prof'))
+            except Exception as error:
+                print(f"Failed to merge the profile of job {job_id}: {error}")
+                shutil.rmtree(profile_dir, ignore_errors=True)
+            profiled_jobs.discard(job_id)
+    artifacts.job_finished()
+
+# Function to continue jobs that were interrupted by a restart
+def resume_pending_jobs():
+    for job_id, user in journal.unfinished_jobs():
+        print(f"Resuming job {job_id}")
+        # A job profiled before the restart keeps profiling; its earlier stats are merged with the rest
+        profile_dir = os.path.join(artifacts.job_folder(job_id), 'profile')
+        threading.Thread(target=process_job, args=(job_id, user, profile_dir if os.path.isdir(profile_dir) else None),
+                         daemon=True).start()
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        uploaded_files = request.files.getlist('file')
-        all_resume_data = []
-
-        for file in uploaded_files:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-            file.save(file_path)
-            
-            # Process file and extract data
-            resume_data = process_resume(file_path)
-            all_resume_data.extend(resume_data)
-
-        # Generate unique output filename
-        current_datetime = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        output_file = os.path.join(app.config['UPLOAD_FOLDER'], f'resumedata_{current_datetime}.xlsx')
-
-        # Save extracted data into Excel
-        create_excel(all_resume_data, output_file)
-
-        return send_file(output_file, as_attachment=True)
-
-    return render_template('index.html')
+        artifacts.start()
+        job_id = uuid.uuid4().hex
+        job_folder = artifacts.job_folder(job_id)
+        os.makedirs(job_folder)
+
+        # Opt-in profiling (only when PROFILING_ENABLED): X-Profile header or ?profile=1
+        profile = profiling_requested(request.headers.get('X-Profile') or request.args.get('profile'))
+        profile_dir = os.path.join(job_folder, 'profile') if profile else None
+
+        with profile_request(profile_dir) if profile else nullcontext():
+            uploaded_files = request.files.getlist('file')
+
+            file_paths = []
+            for file in uploaded_files:
+                # basename keeps every upload inside the job folder, where eviction finds it
+                file_path = os.path.join(job_folder, os.path.basename(file.filename))
+                file.save(file_path)
+                file_paths.append(file_path)
+
+            # Only the selected fields are extracted (form checkboxes or ?fields=email,phone)
+            fields = parse_fields(request.form.getlist('fields') + request.args.getlist('fields'))
+            # With a job description the export gets a Score column and is sorted by it
+            job_description = request.form.get('job_description', '').strip() or None
+
+            user = request.form.get('user') or request.access_route[0]
+            journal.create_job(user, file_paths, job_id=job_id, fields=fields, job_description=job_description)
+
+        # The job id goes back before processing starts: the client polls /jobs/<job_id>/status and
+        # downloads from /jobs/<job_id>, which also works for a job resumed after a restart
+        threading.Thread(target=process_job, args=(job_id, user, profile_dir), daemon=True).start()
+        headers = {'Location': f'/jobs/{job_id}', 'X-Job-Id': job_id, 'X-Result-Url': f'/jobs/{job_id}'}
+        if profile:
+            headers['X-Profile'] = f'/jobs/{job_id}/profile'
+        return {"job_id": job_id, "status_url": f'/jobs/{job_id}/status', "result_url": f'/jobs/{job_id}'}, 202, headers
+
+    return render_template('index.html', fields=FIELDS)
+
+# Job status, or the finished Excel file once the job is done (also for jobs resumed after a restart)
+@app.route('/jobs/<job_id>')
+def job_result(job_id):
+    job = journal.get_job(job_id)
+    if job is None:
+        return {"error": "Job not found"}, 404
+    if job['status'] == 'evicted':
+        return {"error": "The result was deleted after the retention period or to free disk space"}, 410
+    if job['status'] != 'done':
+        return job
+    finished = datetime.fromtimestamp(job['finished'] or job['created'])
+    return send_file(job['output_file'], as_attachment=True,
+                     download_name=f'resumedata_{finished.strftime("%Y-%m-%d_%H-%M-%S")}.xlsx')
+
+# Job status as JSON, also once the job is done (polled by the upload page)
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    job = journal.get_job(job_id)
+    if job is None:
+        return {"error": "Job not found"}, 404
+    return {"job_id": job_id, "status": job['status'], "files": job['files'], "result_url": f'/jobs/{job_id}'}
+
+# Merged profile of a profiled request: pstats file (snakeviz, pstats) or ?format=text for the report
+@app.route('/jobs/<job_id>/profile')
+def job_profile(job_id):
+    job = journal.get_job(job_id)
+    if job is None:
+        return {"error": "Job not found"}, 404
+    if job['status'] == 'evicted':
+        return {"error": "The profile was deleted after the retention period or to free disk space"}, 410
+    if job['status'] == 'running':
+        return job
+    profile_file = os.path.join(artifacts.job_folder(job_id), 'profile.prof')
+    if request.args.get('format') == 'text':
+        profile_file = os.path.splitext(profile_file)[0] + '.txt'
+    if not os.path.exists(profile_file):
+        # The stats are merged just after the job is marked done or failed, by the thread that ran it
+        if job_id in profiled_jobs:
+            return {"status": "merging profile"}, 202
+        return {"error": "Job was not profiled"}, 404
+    return send_file(profile_file, as_attachment=True, download_name=f'profile_{job_id}{os.path.splitext(profile_file)[1]}')
 
 if __name__ == "__main__":
     port = os.getenv("PORT", 5000)  # Use Render's port or default to 5000
+    # The debug reloader imports the app twice; only the serving child resumes jobs and evicts
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        resume_pending_jobs()
+        artifacts.start()
     app.run(host="0.0.0.0", port=int(port), debug=True)  # Start the Flask app
@@ -0,0 +1,132 @@
+import os
+import re
+import shutil
+import threading
+import time
+
+# Finished jobs (uploads, workbook, profile) are kept this long, and the jobs folder is kept
+# under the quota by deleting the oldest finished jobs first (0 turns either limit off)
+RESULT_RETENTION_HOURS = float(os.getenv("RESULT_RETENTION_HOURS", 72))
+DISK_QUOTA_MB = float(os.getenv("DISK_QUOTA_MB", 2048))
+# An evicted job's record (so /jobs/<id> answers "evicted" rather than "unknown") is kept this long (0: forever)
+EVICTED_RETENTION_HOURS = float(os.getenv("EVICTED_RETENTION_HOURS", 720))
+EVICTION_INTERVAL = int(os.getenv("EVICTION_INTERVAL", 300))
+
+job_folder_pattern = re.compile(r'[0-9a-f]{32}')  # uuid4().hex, as index() names job folders
+
+
+def folder_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactStore:
+    """
+    Keeps the per-job folders of the jobs folder within a retention time and a disk quota.
+    A background thread deletes finished jobs older than the retention time, then the
+    oldest finished jobs until the jobs folder fits in the quota, and marks them 'evicted'
+    in the journal, so /jobs/<id> keeps working until then and reports the eviction after.
+    Everything else in the jobs folder (journal.db, duplicates.db, queue.db and their WAL
+    files) counts towards the quota too but is never deleted, so jobs are evicted to make
+    room for it. Running jobs are never deleted, even when they alone exceed the quota.
+    Evicted job records are purged after EVICTED_RETENTION_HOURS and the journal compacted.
+    """
+
+    def __init__(self, root, journal, retention_hours=RESULT_RETENTION_HOURS, quota_mb=DISK_QUOTA_MB,
+                 interval=EVICTION_INTERVAL, evicted_retention_hours=EVICTED_RETENTION_HOURS):
+        self.root = root
+        self.journal = journal
+        self.retention = retention_hours * 3600
+        self.quota = quota_mb * 2 ** 20
+        self.evicted_retention = evicted_retention_hours * 3600
+        self.interval = interval
+        self.sizes = {}  # job_id -> bytes; finished job folders no longer change
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.eviction_loop, daemon=True)
+                self.thread.start()
+
+    def job_folder(self, job_id):
+        return os.path.join(self.root, job_id)
+
+    def job_finished(self):
+        # A new result may push the folder over the quota; check without waiting for the interval
+        self.wakeup.set()
+
+    def eviction_loop(self):
+        while True:
+            try:
+                self.evict()
+            except Exception as error:
+                print(f"Eviction failed: {error}")
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+    def remove(self, job_id):
+        shutil.rmtree(self.job_folder(job_id), ignore_errors=True)
+        self.journal.evict_job(job_id)
+        self.sizes.pop(job_id, None)
+
+    def evict(self):
+        """Deletes expired jobs, then the oldest finished ones until the quota is met. Returns the evicted ids."""
+        now = time.time()
+        finished = self.journal.finished_jobs()
+        evicted = []
+        if self.retention:
+            for job_id, finished_at in finished:
+                if now - finished_at > self.retention:
+                    self.remove(job_id)
+                    evicted.append(job_id)
+        finished = [(job_id, finished_at) for job_id, finished_at in finished if job_id not in evicted]
+
+        # Folders nobody journaled (an upload that failed before its job was created) just expire
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if (job_folder_pattern.fullmatch(name) and os.path.isdir(path) and self.journal.get_job(name) is None
+                    and now - os.path.getmtime(path) > (self.retention or self.interval)):
+                shutil.rmtree(path, ignore_errors=True)
+
+        if self.quota:
+            sizes = {}
+            fixed = 0  # Databases and anything else that is not a job folder
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                try:
+                    if job_folder_pattern.fullmatch(name) and os.path.isdir(path):
+                        sizes[name] = self.sizes.get(name) or folder_size(path)
+                    else:
+                        fixed += folder_size(path) if os.path.isdir(path) else os.path.getsize(path)
+                except OSError:
+                    pass  # Removed while listing (a WAL file checkpointed away)
+            if fixed > self.quota:
+                print(f"Databases and other files in {self.root} alone use {fixed / 2 ** 20:.0f} MB "
+                      f"of the {self.quota / 2 ** 20:.0f} MB disk quota")
+            finished_ids = {job_id for job_id, _ in finished}
+            self.sizes = {job_id: size for job_id, size in sizes.items() if job_id in finished_ids}
+            total = fixed + sum(sizes.values())
+            for job_id, _ in finished:
+                if total <= self.quota:
+                    break
+                total -= sizes.get(job_id, 0)
+                self.remove(job_id)
+                evicted.append(job_id)
+
+        if evicted:
+            print(f"Evicted {len(evicted)} job(s) to stay within the retention time and disk quota")
+
+        # Evicted jobs keep their journal record for a while; then the journal only needs compacting
+        if self.evicted_retention:
+            self.journal.purge_evicted(now - self.evicted_retention)
+        self.journal.compact()
+        return evicted
@@ -0,0 +1,149 @@
+"""
+Command-line batch processor for backfilling a directory of resumes.
+
+Walks a directory tree, extracts every .pdf/.docx file with process_resume across a
+process pool and writes the rows with create_excel, the same export the web app uses.
+--fields limits extraction (and the columns) to e.g. email,phone, and
+--job-description ranks the candidates against a job description. Near-duplicate
+resumes are grouped in a "Duplicate Group" column unless --no-duplicates is given.
+Progress is kept in a job journal next to the output file, so running the command
+again skips files that were already processed and only picks up new ones. The
+settings of the first run are kept in the journal for the whole job.
+While the run goes on, each file's rows are appended to <output>.partial.csv; the
+workbook itself is written once, at the end, when the rows can be ranked.
+
+    python backfill.py cv/ -o resumedata.xlsx --workers 8
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from tqdm import tqdm
+
+from resume_parser import FIELDS, parse_fields, process_resume, finish_rows, create_excel
+from ranking import query_terms
+from dedupe import DuplicateIndex
+from journal import JobJournal
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+JOB_ID = 'backfill'  # Each journal file holds a single backfill job
+
+
+# Function to list every supported resume below a directory
+def find_resumes(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.abspath(os.path.join(root, name))
+
+
+# Function to write the journaled rows, ranked when the job has a job description
+def export(journal, output_file, fields, terms, duplicate_index):
+    rows = finish_rows(journal.keyed_rows(JOB_ID), terms, duplicate_index)
+    create_excel(rows, output_file, fields, ranked=bool(terms), duplicates=duplicate_index is not None)
+
+
+# Function to append one file's rows to the partial CSV, writing the header when the file starts
+def append_partial(partial_file, headers, rows):
+    new_file = not os.path.exists(partial_file)
+    with open(partial_file, 'a', newline='', encoding='utf-8') as partial:
+        writer = csv.writer(partial)
+        if new_file:
+            writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def run_backfill(directory, output_file, workers, journal_path=None, fields=None, job_description=None,
+                 duplicates_path=None):
+    journal = JobJournal(journal_path or output_file + '.journal.db')
+    if journal.get_job(JOB_ID) is None:
+        journal.create_job('cli', [], job_id=JOB_ID, fields=fields or list(FIELDS), job_description=job_description,
+                           duplicates=duplicates_path is not None)
+    # Rows already in the journal were extracted with the settings of the first run
+    job = journal.get_job(JOB_ID)
+    if fields is not None and fields != job['fields']:
+        print(f"Warning: --fields ignored, this journal extracts {','.join(job['fields'])}")
+    if job_description is not None and job_description != job['job_description']:
+        print("Warning: --job-description ignored, this journal ranks against the job description of its first run")
+    # Stored rows only carry the MinHash signatures duplicate detection needs if it was on from the start
+    if job['duplicates'] is not None and bool(job['duplicates']) != (duplicates_path is not None):
+        if job['duplicates']:
+            print("Warning: --no-duplicates ignored, this journal detects near-duplicates")
+            duplicates_path = output_file + '.duplicates.db'
+        else:
+            print("Warning: duplicate detection stays off, this journal was started with --no-duplicates")
+            duplicates_path = None
+    duplicate_index = DuplicateIndex(duplicates_path) if duplicates_path else None
+    fields = job['fields']
+    terms = query_terms(job['job_description']) if job['job_description'] else None
+
+    # Unranked until the end: the Score column needs every row
+    partial_file = output_file + '.partial.csv'
+    headers = [FIELDS[field].header for field in fields]
+    if duplicate_index is not None:
+        headers.append("Duplicate Group")
+    headers.append("File")
+
+    # Only files not seen in a previous run are added; unfinished ones are retried
+    known = journal.known_files(JOB_ID)
+    new_files = [path for path in find_resumes(directory) if path not in known]
+    if new_files:
+        journal.add_files(JOB_ID, new_files)
+    pending = journal.pending_files(JOB_ID)
+    print(f"{len(new_files)} new files, {len(pending)} to process, rows are appended to {partial_file}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_resume, file_path, fields, terms, duplicate_index is not None): (position, file_path) for position, file_path in pending}
+        for future in tqdm(as_completed(futures), total=len(futures), unit='file'):
+            position, file_path = futures[future]
+            try:
+                rows = future.result()
+                journal.record_result(JOB_ID, position, rows)
+            except Exception as error:
+                tqdm.write(f"Failed to process {file_path}: {error}")
+                # A dead worker process is not the file's fault; it stays pending for the next run
+                if not isinstance(error, BrokenProcessPool):
+                    journal.record_failure(JOB_ID, position, error)
+                continue
+
+            # Same keys as journal.keyed_rows(), so the final export sees the same duplicate groups
+            keyed_rows = [(f"{JOB_ID}/{position}/{index}", tuple(row)) for index, row in enumerate(rows)]
+            if duplicate_index is not None:
+                rows = finish_rows(keyed_rows, duplicate_index=duplicate_index)
+            else:
+                rows = [row[:-1] if terms else row for _, row in keyed_rows]
+            append_partial(partial_file, headers, [list(row) + [os.path.basename(file_path)] for row in rows])
+
+    export(journal, output_file, fields, terms, duplicate_index)
+    journal.finish_job(JOB_ID, output_file)
+    # The workbook now holds every row
+    if os.path.exists(partial_file):
+        os.remove(partial_file)
+    print(f"Saved {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract resume data from every PDF/DOCX in a directory.")
+    parser.add_argument('directory', help="Directory to walk for resumes")
+    parser.add_argument('-o', '--output', default='resumedata.xlsx', help="Excel file to write")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--journal', help="Journal database (default: <output>.journal.db)")
+    parser.add_argument('--fields', default='', help="Comma separated fields to extract (default: all)")
+    parser.add_argument('--job-description', help="Text file with a job description to rank candidates against")
+    parser.add_argument('--duplicates-db', help="Near-duplicate index (default: <output>.duplicates.db)")
+    parser.add_argument('--no-duplicates', action='store_true', help="Skip near-duplicate detection")
+    args = parser.parse_args()
+
+    job_description = None
+    if args.job_description:
+        with open(args.job_description, encoding='utf-8') as description:
+            job_description = description.read()
+    duplicates_path = None if args.no_duplicates else args.duplicates_db or args.output + '.duplicates.db'
+    run_backfill(args.directory, args.output, args.workers, args.journal,
+                 parse_fields([args.fields]) if args.fields else None, job_description, duplicates_path)
+
+
+if __name__ == "__main__":
+    main()
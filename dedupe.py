@@ -0,0 +1,124 @@
+import hashlib
+import re
+import sqlite3
+import zlib
+
+import numpy as np
+
+# MinHash signatures of SHINGLE_SIZE-word shingles; NUM_PERM = LSH_BANDS * ROWS_PER_BAND
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+# Documents sharing a band are compared; at least this estimated Jaccard similarity makes them duplicates
+DUPLICATE_THRESHOLD = 0.8
+MINHASH_CHUNK = 4096  # Shingles hashed per step
+
+MERSENNE_PRIME = (1 << 31) - 1
+# Fixed seed so signatures from every worker process and every run are comparable
+hash_a, hash_b = np.random.default_rng(20240601).integers(1, MERSENNE_PRIME, size=(2, NUM_PERM), dtype=np.uint64)
+
+word_pattern = re.compile(r'\w+')
+
+
+def shingle_ids(text):
+    """Returns a stable 32-bit id for every run of SHINGLE_SIZE consecutive words of case-folded text."""
+    words = word_pattern.findall(text)
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    # zlib.crc32 rather than hash(), which is salted differently in every process
+    return np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(text):
+    """
+    Returns the NUM_PERM-value MinHash signature of the text as a list of ints (JSON friendly),
+    or None when the text has fewer than SHINGLE_SIZE words (an empty or scanned PDF), since
+    such documents would all look identical.
+    """
+    ids = shingle_ids(text) % MERSENNE_PRIME
+    if not len(ids):
+        return None
+    signature = np.full(NUM_PERM, MERSENNE_PRIME, dtype=np.uint64)
+    # Hashed in chunks so a huge document never needs a NUM_PERM x shingles matrix at once
+    for start in range(0, len(ids), MINHASH_CHUNK):
+        chunk = ids[start:start + MINHASH_CHUNK]
+        # (a * x + b) mod p for every permutation and shingle; a, x < 2^31 so the product fits in 64 bits
+        hashes = (hash_a[:, None] * chunk[None, :] + hash_b[:, None]) % MERSENNE_PRIME
+        np.minimum(signature, hashes.min(axis=1), out=signature)
+    return signature.tolist()
+
+
+def band_hashes(signature):
+    signature = np.asarray(signature, dtype=np.uint32)
+    return [int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+            for band in signature.reshape(LSH_BANDS, ROWS_PER_BAND)]
+
+
+class DuplicateIndex:
+    """
+    Persistent LSH index of every resume seen, kept in SQLite.
+    A new signature is only compared with documents that share at least one band bucket,
+    so lookups stay cheap however large the archive grows (no pairwise comparison).
+    Documents are stored under a caller-supplied key, so adding the same one twice is harmless.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with sqlite3.connect(db_path) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT UNIQUE,
+                    group_id INTEGER,
+                    signature BLOB
+                )""")
+            db.execute("CREATE TABLE IF NOT EXISTS buckets (band INTEGER, hash INTEGER, document_id INTEGER)")
+            db.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, hash)")
+            db.execute("CREATE INDEX IF NOT EXISTS documents_group ON documents (group_id)")
+
+    def add(self, db, key, signature):
+        """Adds one document and returns its duplicate group id."""
+        existing = db.execute("SELECT group_id FROM documents WHERE key = ?", (key,)).fetchone()
+        if existing:
+            return existing[0]
+
+        signature = np.asarray(signature, dtype=np.uint32)
+        hashes = band_hashes(signature)
+        candidates = set()
+        for band, band_hash in enumerate(hashes):
+            candidates.update(document_id for (document_id,) in db.execute(
+                "SELECT document_id FROM buckets WHERE band = ? AND hash = ?", (band, band_hash)))
+
+        # Verify bucket collisions with the estimated Jaccard similarity of the full signatures
+        group_id, best = None, DUPLICATE_THRESHOLD
+        for document_id in candidates:
+            candidate_group, candidate_signature = db.execute(
+                "SELECT group_id, signature FROM documents WHERE id = ?", (document_id,)).fetchone()
+            similarity = np.mean(np.frombuffer(candidate_signature, dtype=np.uint32) == signature)
+            if similarity >= best:
+                group_id, best = candidate_group, similarity
+
+        document_id = db.execute("INSERT INTO documents (key, group_id, signature) VALUES (?, ?, ?)",
+                                 (key, group_id, signature.tobytes())).lastrowid
+        if group_id is None:
+            group_id = document_id
+            db.execute("UPDATE documents SET group_id = ? WHERE id = ?", (group_id, document_id))
+        db.executemany("INSERT INTO buckets VALUES (?, ?, ?)",
+                       [(band, band_hash, document_id) for band, band_hash in enumerate(hashes)])
+        return group_id
+
+    def assign_groups(self, keyed_signatures):
+        """
+        Adds (key, signature) pairs in order and returns, for each, its duplicate group id,
+        or None when no other document in the archive belongs to the same group.
+        Documents without a signature (too little text) are skipped and get None.
+        """
+        with sqlite3.connect(self.db_path, timeout=30) as db:
+            groups = [None if signature is None else self.add(db, key, signature)
+                      for key, signature in keyed_signatures]
+            sizes = {None: 0}
+            for group_id in set(groups) - {None}:
+                (sizes[group_id],) = db.execute("SELECT COUNT(*) FROM documents WHERE group_id = ?",
+                                                (group_id,)).fetchone()
+        return [group_id if sizes[group_id] > 1 else None for group_id in groups]
@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import time
+import uuid
+
+
+class JobJournal:
+    """
+    Durable record of batch jobs kept in a SQLite database.
+    Every file's extracted rows are committed as soon as the file finishes, so after a
+    restart only the files still marked 'pending' need to be processed again.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user TEXT,
+                    created REAL,
+                    status TEXT,
+                    output_file TEXT,
+                    fields TEXT,
+                    job_description TEXT,
+                    finished REAL,
+                    evicted REAL,
+                    duplicates INTEGER
+                )""")
+            # Journals created by older versions lack the newer job columns
+            columns = [column[1] for column in db.execute("PRAGMA table_info(jobs)")]
+            for column, column_type in (('fields', 'TEXT'), ('job_description', 'TEXT'), ('finished', 'REAL'),
+                                        ('evicted', 'REAL'), ('duplicates', 'INTEGER')):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT,
+                    position INTEGER,
+                    file_path TEXT,
+                    status TEXT,
+                    rows TEXT,
+                    error TEXT,
+                    PRIMARY KEY (job_id, position)
+                )""")
+
+    def connect(self):
+        # A short-lived connection per call keeps the journal safe to use from scheduler threads
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create_job(self, user, file_paths, job_id=None, fields=None, job_description=None, duplicates=None):
+        """duplicates records whether rows carry MinHash signatures (None: not recorded)."""
+        job_id = job_id or uuid.uuid4().hex
+        with self.connect() as db:
+            db.execute("INSERT INTO jobs VALUES (?, ?, ?, 'running', NULL, ?, ?, NULL, NULL, ?)",
+                       (job_id, user, time.time(), json.dumps(fields), job_description,
+                        None if duplicates is None else int(duplicates)))
+            db.executemany(
+                "INSERT INTO job_files VALUES (?, ?, ?, 'pending', NULL, NULL)",
+                [(job_id, position, file_path) for position, file_path in enumerate(file_paths)])
+        return job_id
+
+    def add_files(self, job_id, file_paths):
+        """Appends files to an existing job and marks the job as running again."""
+        with self.connect() as db:
+            (last,) = db.execute("SELECT COALESCE(MAX(position), -1) FROM job_files WHERE job_id = ?",
+                                 (job_id,)).fetchone()
+            db.executemany(
+                "INSERT INTO job_files VALUES (?, ?, ?, 'pending', NULL, NULL)",
+                [(job_id, last + 1 + offset, file_path) for offset, file_path in enumerate(file_paths)])
+            db.execute("UPDATE jobs SET status = 'running' WHERE id = ?", (job_id,))
+
+    def known_files(self, job_id):
+        """Returns the paths of every file already added to the job, whatever its status."""
+        with self.connect() as db:
+            return {file_path for (file_path,) in
+                    db.execute("SELECT file_path FROM job_files WHERE job_id = ?", (job_id,))}
+
+    def record_result(self, job_id, position, rows):
+        with self.connect() as db:
+            db.execute("UPDATE job_files SET status = 'done', rows = ? WHERE job_id = ? AND position = ?",
+                       (json.dumps([list(row) for row in rows]), job_id, position))
+
+    def record_failure(self, job_id, position, error):
+        with self.connect() as db:
+            db.execute("UPDATE job_files SET status = 'failed', error = ? WHERE job_id = ? AND position = ?",
+                       (str(error), job_id, position))
+
+    def pending_files(self, job_id):
+        """Returns (position, file_path) for every file of the job that has not finished yet."""
+        with self.connect() as db:
+            return db.execute(
+                "SELECT position, file_path FROM job_files WHERE job_id = ? AND status = 'pending' ORDER BY position",
+                (job_id,)).fetchall()
+
+    def keyed_rows(self, job_id):
+        """
+        Returns the extracted rows of all finished files in upload order as (key, row) pairs.
+        The key ("<job>/<file position>/<row>") identifies a row across calls.
+        """
+        with self.connect() as db:
+            results = db.execute(
+                "SELECT position, rows FROM job_files WHERE job_id = ? AND status = 'done' ORDER BY position",
+                (job_id,)).fetchall()
+        return [(f"{job_id}/{position}/{index}", tuple(row))
+                for position, rows in results for index, row in enumerate(json.loads(rows))]
+
+    def finish_job(self, job_id, output_file):
+        with self.connect() as db:
+            db.execute("UPDATE jobs SET status = 'done', output_file = ?, finished = ? WHERE id = ?",
+                       (output_file, time.time(), job_id))
+
+    def fail_job(self, job_id):
+        with self.connect() as db:
+            db.execute("UPDATE jobs SET status = 'failed', finished = ? WHERE id = ?", (time.time(), job_id))
+
+    def finished_jobs(self):
+        """Returns (job_id, finished time) for every finished (or failed) job, oldest first."""
+        with self.connect() as db:
+            return db.execute("SELECT id, COALESCE(finished, created) FROM jobs WHERE status IN ('done', 'failed') "
+                              "ORDER BY COALESCE(finished, created)").fetchall()
+
+    def evict_job(self, job_id):
+        """Marks a job whose files were deleted and drops its rows; its status stays queryable until purged."""
+        with self.connect() as db:
+            db.execute("UPDATE jobs SET status = 'evicted', output_file = NULL, evicted = ? WHERE id = ?",
+                       (time.time(), job_id))
+            db.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+
+    def purge_evicted(self, before):
+        """Deletes the records of jobs evicted before the given time; returns how many were deleted."""
+        with self.connect() as db:
+            return db.execute("DELETE FROM jobs WHERE status = 'evicted' AND evicted < ?", (before,)).rowcount
+
+    def compact(self, min_free=0.25):
+        """Rebuilds the database file once at least `min_free` of its pages are unused (deleted rows)."""
+        with self.connect() as db:
+            (page_count,) = db.execute("PRAGMA page_count").fetchone()
+            (free_pages,) = db.execute("PRAGMA freelist_count").fetchone()
+        if not page_count or free_pages < page_count * min_free:
+            return False
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            db.execute("VACUUM")
+            # VACUUM goes through the WAL; hand its pages back to the main file and empty the WAL
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            db.close()
+        return True
+
+    def get_job(self, job_id):
+        with self.connect() as db:
+            db.row_factory = sqlite3.Row
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(db.execute(
+                "SELECT status, COUNT(*) FROM job_files WHERE job_id = ? GROUP BY status", (job_id,)).fetchall())
+        return dict(job, fields=json.loads(job['fields'] or 'null'), files=counts)
+
+    def unfinished_jobs(self):
+        """
+        Returns (job_id, user) for every job that was still running when the process stopped,
+        and every finished job with files left pending by a pool or queue failure.
+        """
+        with self.connect() as db:
+            return db.execute(
+                "SELECT id, user FROM jobs WHERE status = 'running' OR status = 'done' AND id IN "
+                "(SELECT job_id FROM job_files WHERE status = 'pending') ORDER BY created").fetchall()
@@ -0,0 +1,342 @@
+"""
+Load generator for the upload endpoint of a locally running app.
+
+Replays uploads of the cv/ corpus, plus synthetic PDF and DOCX resumes of a controlled
+size, at a fixed concurrency and (optionally) a fixed request rate, and reports
+throughput, p50/p95/p99 latency, error rate and the memory (RSS) of the app and its pool
+workers over time. Everything runs offline against localhost. The report is saved as
+JSON; pass an earlier report with --compare to see the change between releases.
+Uploads are spread over --users fair-share users (one per thread by default), since the
+scheduler caps each user at PER_USER_CONCURRENCY workers. With WORK_QUEUE=sqlite, pass
+the worker.py pids after the app's to --pid so their memory is reported too.
+
+    python app.py &
+    python loadtest.py --pid $! --concurrency 8 --requests 200 --synthetic 20 -o report.json
+    python loadtest.py --pid $! --rate 2 --duration 120 --compare report.json
+"""
+import argparse
+import json
+import mimetypes
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from synthetic import make_docx, make_pdf, resume_lines
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+PAGE_SIZE = 4096  # /proc/<pid>/statm counts pages
+
+
+# Function to build a multipart/form-data body the way a browser posts the upload form
+def multipart_body(file_paths, fields):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for path in file_paths:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        with open(path, 'rb') as upload:
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+                         f'filename="{os.path.basename(path)}"\r\nContent-Type: {content_type}\r\n\r\n'.encode()
+                         + upload.read() + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def corpus_files(directory):
+    if not directory or not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(SUPPORTED_EXTENSIONS))
+
+
+def synthetic_files(directory, count, size):
+    """Writes `count` synthetic resumes of about `size` characters, alternating PDF and DOCX."""
+    paths = []
+    for number in range(count):
+        lines = resume_lines(f"Candidate {number:04d}", size)
+        if number % 2:
+            path = os.path.join(directory, f"candidate_{number:04d}.docx")
+            make_docx(lines, path)
+        else:
+            path = os.path.join(directory, f"candidate_{number:04d}.pdf")
+            make_pdf([lines[i:i + 60] for i in range(0, len(lines), 60)], path)
+        paths.append(path)
+    return paths
+
+
+def process_tree(pid):
+    """Returns the pid and every descendant pid (the Flask process and its pool workers)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                # The command name may contain spaces; the fields after it are fixed
+                parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE / 2 ** 20
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class RssSampler(threading.Thread):
+    """Samples the RSS of the process trees of `pids` (the app, queue workers) every `interval` seconds until stopped."""
+
+    def __init__(self, pids, interval):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.start_time = time.monotonic()
+
+    def run(self):
+        while not self.stopped.is_set():
+            processes = {}
+            for pid in {pid for root in self.pids for pid in process_tree(root)}:
+                size = rss_mb(pid)
+                if size is not None:
+                    processes[pid] = round(size, 1)
+            self.samples.append({'t': round(time.monotonic() - self.start_time, 2),
+                                 'total_mb': round(sum(processes.values()), 1),
+                                 'processes': processes})
+            self.stopped.wait(self.interval)
+
+
+class LoadTest:
+    """
+    Sends `requests` uploads (or as many as fit in `duration` seconds) from `concurrency`
+    threads, thread i uploading as user i % `users` (default: a user per thread).
+    Latency runs from the upload until the finished workbook is downloaded.
+    With a rate, request i is not sent before start + i / rate, so the offered
+    load stays fixed however slowly the server answers (open loop); without one each
+    thread sends its next upload as soon as the previous answer arrives (closed loop).
+    """
+
+    def __init__(self, url, files, files_per_request, concurrency, rate=None, requests=None, duration=None,
+                 fields=None, timeout=300, poll_interval=0.2, users=None):
+        self.url = url
+        self.files = files
+        self.files_per_request = files_per_request
+        self.concurrency = concurrency
+        self.users = users or concurrency
+        self.rate = rate
+        self.requests = requests
+        self.duration = duration
+        self.fields = fields or {}
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.results = []  # (sent at, latency, status, error)
+        self.lock = threading.Lock()
+        self.sent = 0
+
+    def next_request(self):
+        with self.lock:
+            index = self.sent
+            if self.requests is not None and index >= self.requests:
+                return None
+            self.sent += 1
+        due = self.start_time + index / self.rate if self.rate else time.monotonic()
+        if self.duration is not None and due - self.start_time >= self.duration:
+            return None
+        return index, due
+
+    def send(self, index, user):
+        # Every request uploads a different window of the file list so all files get replayed
+        start = index * self.files_per_request
+        paths = [self.files[(start + offset) % len(self.files)] for offset in range(self.files_per_request)]
+        body, content_type = multipart_body(paths, dict(self.fields, user=user))
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': content_type})
+        deadline = time.monotonic() + self.timeout
+        try:
+            # The upload answers 202 with the job id; the job is polled until done, then downloaded
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                job = json.load(response)
+            while True:
+                with urllib.request.urlopen(urllib.parse.urljoin(self.url, job['status_url']), timeout=self.timeout) as response:
+                    status = json.load(response)['status']
+                if status != 'running':
+                    break
+                if time.monotonic() > deadline:
+                    return None, "Timed out waiting for the job"
+                time.sleep(self.poll_interval)
+            if status != 'done':
+                return None, f"Job {status}"
+            with urllib.request.urlopen(urllib.parse.urljoin(self.url, job['result_url']), timeout=self.timeout) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, f"HTTP {error.code}"
+        except Exception as error:
+            return None, repr(error)
+
+    def worker(self, number):
+        # All uploads come from 127.0.0.1, so without a user name they would share one fair-share queue
+        user = f"loadtest-{number % self.users}"
+        while True:
+            job = self.next_request()
+            if job is None:
+                return
+            index, due = job
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            sent = time.monotonic()
+            status, error = self.send(index, user)
+            latency = time.monotonic() - sent
+            with self.lock:
+                self.results.append((sent - self.start_time, latency, status, error))
+
+    def run(self):
+        self.start_time = time.monotonic()
+        threads = [threading.Thread(target=self.worker, args=(number,), daemon=True)
+                   for number in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - self.start_time
+        return self.results
+
+
+def summarize(results, elapsed, files_per_request):
+    latencies = np.array([latency for _, latency, _, error in results if error is None])
+    errors = [error for _, _, _, error in results if error is not None]
+    summary = {
+        'requests': len(results),
+        'errors': len(errors),
+        'error_rate': round(len(errors) / len(results), 4) if results else 0.0,
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        'throughput_files_per_s': round(len(latencies) * files_per_request / elapsed, 3) if elapsed else 0.0,
+    }
+    for name, percentile in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100)):
+        summary[f'latency_{name}_s'] = round(float(np.percentile(latencies, percentile)), 3) if len(latencies) else None
+    summary['error_messages'] = sorted(set(errors))[:20]
+    return summary
+
+
+def print_report(report, previous=None):
+    summary = report['summary']
+    print(f"\n{'metric':<26} {'value':>12}" + (f" {'previous':>12} {'change':>9}" if previous else ''))
+    for key, value in summary.items():
+        if key == 'error_messages':
+            continue
+        line = f"{key:<26} {value if value is not None else '-':>12}"
+        if previous:
+            before = previous['summary'].get(key)
+            line += f" {before if before is not None else '-':>12}"
+            if before and value is not None:
+                line += f" {(value - before) / before:+9.1%}"
+        print(line)
+    if report['rss']:
+        peak = max(sample['total_mb'] for sample in report['rss'])
+        workers = max(len(sample['processes']) for sample in report['rss'])
+        print(f"{'peak_rss_mb':<26} {peak:>12.1f}" + (f" {previous.get('peak_rss_mb') or '-':>12}" if previous else ''))
+        print(f"processes sampled: up to {workers} (app, pool and queue workers)")
+    for message in summary['error_messages']:
+        print(f"  error: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay resume uploads against a locally running app.")
+    parser.add_argument('--url', default='http://127.0.0.1:5000/', help="Upload endpoint")
+    parser.add_argument('--corpus', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cv'),
+                        help="Directory of real resumes to replay ('' for none)")
+    parser.add_argument('--synthetic', type=int, default=0, help="Synthetic PDF/DOCX resumes to add")
+    parser.add_argument('--synthetic-size', type=int, default=3000, help="Characters per synthetic resume")
+    parser.add_argument('--files-per-request', type=int, default=1, help="Files in each upload")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help="Uploads in flight at once")
+    parser.add_argument('--users', type=int, help="Distinct users the uploads come from (default: one per thread)")
+    parser.add_argument('--rate', type=float, help="Uploads started per second (default: as fast as answered)")
+    parser.add_argument('-n', '--requests', type=int, help="Total uploads (default 50 unless --duration)")
+    parser.add_argument('--duration', type=float, help="Stop starting uploads after this many seconds")
+    parser.add_argument('--fields', help="Comma-separated fields to extract, e.g. email,phone")
+    parser.add_argument('--job-description', help="File with a job description to rank against")
+    parser.add_argument('--pid', type=int, nargs='+',
+                        help="Pid of the app, then of any worker.py processes; their RSS and their children's is sampled")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Seconds between RSS samples")
+    parser.add_argument('--timeout', type=float, default=300, help="Seconds before an upload counts as failed")
+    parser.add_argument('-o', '--output', help="Report file (default loadtest_<timestamp>.json)")
+    parser.add_argument('--compare', help="Earlier report to compare with")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the order files are replayed in")
+    args = parser.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 50
+
+    fields = {}
+    if args.fields:
+        fields['fields'] = args.fields
+    if args.job_description:
+        with open(args.job_description, encoding='utf-8') as job_description:
+            fields['job_description'] = job_description.read()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = corpus_files(args.corpus) + synthetic_files(directory, args.synthetic, args.synthetic_size)
+        if not files:
+            parser.error("no files to upload: give a --corpus with resumes or --synthetic N")
+        random.Random(args.seed).shuffle(files)
+        print(f"Replaying {len(files)} files against {args.url} with concurrency {args.concurrency}"
+              + f" from {args.users or args.concurrency} user(s)" + (f" at {args.rate}/s" if args.rate else ''))
+
+        sampler = RssSampler(args.pid, args.sample_interval) if args.pid else None
+        if sampler:
+            sampler.start()
+        load_test = LoadTest(args.url, files, args.files_per_request, args.concurrency, rate=args.rate,
+                             requests=args.requests, duration=args.duration, fields=fields, timeout=args.timeout,
+                             users=args.users)
+        results = load_test.run()
+        if sampler:
+            sampler.stopped.set()
+            sampler.join()
+
+    rss = sampler.samples if sampler else []
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'files': len(files),
+        'summary': summarize(results, load_test.elapsed, args.files_per_request),
+        'peak_rss_mb': max((sample['total_mb'] for sample in rss), default=None),
+        'rss': rss,
+        'requests': [{'t': round(sent, 3), 'latency_s': round(latency, 3), 'status': status, 'error': error}
+                     for sent, latency, status, error in sorted(results)],
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous = json.load(previous_file)
+    print_report(report, previous)
+
+    output = args.output or f'loadtest_{datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}.json'
+    with open(output, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f"\nReport saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
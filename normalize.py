@@ -0,0 +1,91 @@
+import re
+import unicodedata
+from functools import cached_property
+
+# Characters PDF and DOCX text is littered with that never carry meaning
+REMOVED_CHARACTERS = {'\u00ad', '\u200b', '\u200c', '\u200d', '\u2060', '\ufeff'}  # soft hyphen, zero-width
+LINE_BREAKS = {'\r', '\u2028', '\u2029', '\x0b', '\x0c', '\x85'}
+
+# A word broken across lines by a hyphen ("manage-\nment"); only lowercase on both sides so "Co-\nFounder" stays
+hyphenated_break = re.compile(r'(?<=[a-z])-[ \t]*\n[ \t]*(?=[a-z])')
+repeated_spaces = re.compile(r'(?<= ) +')
+
+
+def normalize_with_offsets(text):
+    """
+    Normalizes extracted text and returns (normalized text, offsets) where offsets[i] is
+    the index in the original text of normalized character i.
+    NFKC (ligatures such as "ﬁ" become "fi", non-breaking and other odd spaces become
+    plain spaces), zero-width characters removed, line breaks unified, hyphenated line
+    breaks joined and runs of spaces collapsed.
+    """
+    if text.isascii() and not any(char in text for char in LINE_BREAKS):
+        # Plain ASCII (most resumes) needs no per-character pass
+        chars, offsets = text.replace('\t', ' '), list(range(len(text)))
+        index = len(text)
+    else:
+        chars, offsets = [], []
+        index = 0
+    while index < len(text):
+        # Normalize a base character together with its combining marks
+        end = index + 1
+        while end < len(text) and unicodedata.combining(text[end]):
+            end += 1
+        cluster = text[index:end]
+
+        if cluster in REMOVED_CHARACTERS:
+            pass
+        elif cluster in LINE_BREAKS:
+            if not (cluster == '\r' and text[end:end + 1] == '\n'):
+                chars.append('\n')
+                offsets.append(index)
+        else:
+            for char in unicodedata.normalize('NFKC', cluster):
+                chars.append(' ' if char != '\n' and char.isspace() else char)
+                offsets.append(index)
+        index = end
+
+    normalized = ''.join(chars)
+    drop = set()
+    for pattern in (hyphenated_break, repeated_spaces):
+        for match in pattern.finditer(normalized):
+            drop.update(range(match.start(), match.end()))
+    if drop:
+        keep = [i for i in range(len(normalized)) if i not in drop]
+        normalized = ''.join(normalized[i] for i in keep)
+        offsets = [offsets[i] for i in keep]
+    return normalized, offsets
+
+
+def fold_case(text):
+    """
+    Case-folds the text character by character, keeping its length so offsets into the
+    normalized text are also offsets into the folded copy ("ß" stays "ß" rather than "ss").
+    """
+    folded = text.casefold()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(char.casefold() if len(char.casefold()) == 1 else char.lower() if len(char.lower()) == 1 else char
+                   for char in text)
+
+
+class NormalizedText:
+    """
+    The text of one document, normalized once right after reading.
+    `text` keeps the original case for output; `folded` is the case-folded copy that
+    case-insensitive matching runs on. Both share the same offsets, and original_span()
+    maps them back to the text as it was read.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self.text, self.offsets = normalize_with_offsets(original)
+
+    @cached_property
+    def folded(self):
+        return fold_case(self.text)
+
+    def original_span(self, start, end):
+        if start >= len(self.offsets):
+            return len(self.original), len(self.original)
+        return self.offsets[start], self.offsets[end - 1] + 1 if end > start else self.offsets[start]
@@ -0,0 +1,142 @@
+"""
+Adversarial-input performance checks for the extractors.
+
+Every extractor (and process_resume on generated PDF and DOCX files) is run on hostile
+inputs: long digit runs, megabyte-long lines, giant email-like tokens, pages of repeated
+keywords. Each input is timed at two sizes. A check fails when a call exceeds its time
+budget, or when quadrupling the input makes it more than --max-growth times slower,
+which catches super-linear (e.g. regex backtracking) behaviour. Exits with status 1 on failure.
+
+    python perf_check.py
+    python perf_check.py --size 250000 --budget 2 --max-growth 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from dedupe import minhash_signature
+from normalize import NormalizedText, fold_case
+from phone import extract_phone
+from ranking import query_terms, term_counts
+from resume_parser import (extract_designation_simple, extract_email, extract_name, extract_nationality,
+                           name_similarity, process_resume, split_candidates)
+from sections import segment_sections
+from skills import extract_skills
+from synthetic import make_docx, make_pdf, resume_lines
+
+# Hostile inputs: name -> function building roughly `size` characters
+INPUTS = {
+    'digit run': lambda size: '9' * size,
+    'spaced digits': lambda size: '12 ' * (size // 3),
+    'numeric table': lambda size: ('2019 2020 3.5 -12 (44) 0.75\n' * (size // 28)),
+    'long line': lambda size: 'word ' * (size // 5),
+    'email-like token': lambda size: 'a' * size,
+    'dotted email token': lambda size: 'a.' * (size // 2) + '@',
+    'at signs': lambda size: 'a@' * (size // 2),
+    'domain without tld': lambda size: 'user@' + 'a-' * (size // 2),
+    'repeated keywords': lambda size: 'Senior Project Manager Engineer Nurse UK India\n' * (size // 47),
+    'repeated headings': lambda size: 'Experience\nSkills\nEducation\n' * (size // 28),
+    'whitespace': lambda size: ' \t' * (size // 2),
+    'hyphen breaks': lambda size: 'co-\n' * (size // 4),
+    'unicode': lambda size: '\ufb01 \u00a0e\u0301\u200b' * (size // 5),
+}
+
+JOB_TERMS = query_terms("Registered nurse with ICU experience and patient care")
+
+# Extractors under test; the ones that expect case-folded text get it folded, as ResumeDocument does
+EXTRACTORS = {
+    'extract_email': extract_email,
+    'extract_phone': lambda text: extract_phone(fold_case(text)),
+    'extract_name': extract_name,
+    'name_similarity': lambda text: name_similarity(extract_name(text) or '', 'Jane Doe CV.pdf'),
+    'extract_nationality': lambda text: extract_nationality(fold_case(text)),
+    'extract_designation_simple': lambda text: extract_designation_simple(fold_case(text)),
+    'extract_skills': lambda text: extract_skills(fold_case(text), text),
+    'segment_sections': segment_sections,
+    'split_candidates': lambda text: split_candidates([text, text]),
+    'normalize': NormalizedText,
+    'term_counts': lambda text: term_counts(fold_case(text), JOB_TERMS),
+    'minhash_signature': lambda text: minhash_signature(fold_case(text)),
+}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def check(name, func, small_input, large_input, budget, max_growth, noise_floor):
+    """Returns an error message, or None when the check passes."""
+    small = timed(func, small_input)
+    large = timed(func, large_input)
+    growth = large / max(small, noise_floor)
+    print(f"{name:<60} {small * 1000:9.1f} ms {large * 1000:9.1f} ms  x{growth:5.1f}")
+    if large > budget:
+        return f"{name}: {large:.2f}s exceeds the {budget:.2f}s budget"
+    if large > noise_floor and growth > max_growth:
+        return f"{name}: 4x the input took {growth:.1f}x as long (super-linear)"
+    return None
+
+
+# Function to run process_resume on a generated file holding a resume followed by hostile text
+def file_checks(directory, size, budget, max_growth, noise_floor):
+    failures = []
+    for input_name, build in INPUTS.items():
+        for extension, write in (('.docx', make_docx), ('.pdf', None)):
+            paths = []
+            for scale in (1, 4):
+                # Long single lines are wrapped so pdfplumber sees a real page of text
+                hostile = build(size * scale)
+                lines = resume_lines() + [hostile[i:i + 2000] for i in range(0, len(hostile), 2000)]
+                path = os.path.join(directory, f"{input_name.replace(' ', '_')}_{scale}{extension}")
+                if write:
+                    write(lines, path)
+                else:
+                    make_pdf([lines[i:i + 60] for i in range(0, len(lines), 60)], path)
+                paths.append(path)
+            failure = check(f"process_resume{extension} / {input_name}", process_resume, paths[0], paths[1],
+                            budget, max_growth, noise_floor)
+            if failure:
+                failures.append(failure)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the extractors for slow or super-linear behaviour.")
+    parser.add_argument('--size', type=int, default=250_000, help="Characters in the smaller hostile input")
+    parser.add_argument('--file-size', type=int, default=20_000, help="Hostile characters added to generated files")
+    parser.add_argument('--budget', type=float, default=2.0, help="Seconds allowed per extractor call")
+    parser.add_argument('--file-budget', type=float, default=20.0, help="Seconds allowed per process_resume call")
+    parser.add_argument('--max-growth', type=float, default=8.0,
+                        help="Allowed slowdown for a 4x larger input (linear is ~4, quadratic ~16)")
+    parser.add_argument('--noise-floor', type=float, default=0.02, help="Timings below this many seconds are noise")
+    parser.add_argument('--skip-files', action='store_true', help="Only check the extractors, not process_resume")
+    args = parser.parse_args()
+
+    print(f"{'check':<60} {'1x':>12} {'4x':>12}  growth")
+    failures = []
+    for input_name, build in INPUTS.items():
+        small_input, large_input = build(args.size), build(args.size * 4)
+        for extractor_name, extractor in EXTRACTORS.items():
+            failure = check(f"{extractor_name} / {input_name}", extractor, small_input, large_input,
+                            args.budget, args.max_growth, args.noise_floor)
+            if failure:
+                failures.append(failure)
+
+    if not args.skip_files:
+        with tempfile.TemporaryDirectory() as directory:
+            failures += file_checks(directory, args.file_size, args.file_budget, args.max_growth, args.noise_floor)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == "__main__":
+    main()
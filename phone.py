@@ -0,0 +1,131 @@
+import csv
+import os
+import re
+from collections import namedtuple
+
+# Per-country numbering rules (see the header of the file for the columns)
+PHONE_RULES = os.getenv("PHONE_RULES") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'phone_lengths.csv')
+# Regions tried, in order, for numbers written without a country code
+PHONE_REGIONS = [region.strip() for region in os.getenv("PHONE_REGIONS", "AE,IN,GB,US").split(',') if region.strip()]
+MAX_DIGITS = 15  # Longest number E.164 allows
+
+Rule = namedtuple('Rule', ['region', 'country_code', 'trunk_prefix', 'min_length', 'max_length', 'mobile_prefixes'])
+
+# Digits with the separators people put in phone numbers. Nothing follows the repeated
+# class, so the engine never backtracks and long digit runs are scanned in linear time.
+candidate_pattern = re.compile(r'\+?\(?\d[\d \t().-]*')
+phone_label = re.compile(r'(?:mobile|mob|cell|phone|ph|tel|telephone|contact|whatsapp|call)\b[^a-z\n]*$')
+fax_label = re.compile(r'fax\b[^a-z\n]*$')
+# "(985) 555-1234": a parenthesized 3-digit area code is North American whatever PHONE_REGIONS says
+north_american_format = re.compile(r'(?:1[ .-]?)?\(\d{3}\)[ .-]?\d{3}[ .-]?\d{4}')
+# North American area and exchange codes never start with 0 or 1
+north_american_number = re.compile(r'[2-9]\d{2}[2-9]\d{6}')
+LABEL_WINDOW = 30  # Characters before a number searched for a label
+
+
+def load_rules(path):
+    with open(path, newline='', encoding='utf-8') as rules_file:
+        rows = csv.DictReader(line for line in rules_file if not line.startswith('#'))
+        return [Rule(row['region'], row['country_code'], row['trunk_prefix'], int(row['min_length']),
+                     int(row['max_length']), tuple(row['mobile_prefixes'].split())) for row in rows]
+
+
+rules = load_rules(PHONE_RULES)
+rules_by_code = {}
+for rule in rules:
+    rules_by_code.setdefault(rule.country_code, []).append(rule)
+rules_by_region = {rule.region: rule for rule in rules}
+
+
+def fits(rule, national):
+    if rule.country_code == '1' and not north_american_number.fullmatch(national):
+        return False
+    return rule.min_length <= len(national) <= rule.max_length
+
+
+def is_mobile(rule, national):
+    return national.startswith(rule.mobile_prefixes) if rule.mobile_prefixes else False
+
+
+def to_e164(raw, digits):
+    """
+    Validates a candidate against the numbering rules.
+    Returns (E.164 number, is mobile, has country code) or None if no rule accepts it.
+    A number without a country code that several regions accept is returned as written
+    rather than guessing the country.
+    """
+    if raw.startswith('+') or digits.startswith('00'):
+        digits = digits if raw.startswith('+') else digits[2:]
+        for size in (1, 2, 3):
+            for rule in rules_by_code.get(digits[:size], ()):
+                national = digits[size:]
+                # "+971 (0)50 ..." style numbers repeat the trunk prefix
+                if rule.trunk_prefix and national.startswith(rule.trunk_prefix) and not fits(rule, national):
+                    national = national[len(rule.trunk_prefix):]
+                if fits(rule, national):
+                    return f"+{rule.country_code}{national}", is_mobile(rule, national), True
+        return None
+
+    if 'US' in rules_by_region and north_american_format.fullmatch(raw):
+        rule = rules_by_region['US']
+        return f"+{rule.country_code}{digits[-rule.max_length:]}", False, False
+
+    accepted = {}
+    for region in PHONE_REGIONS:
+        rule = rules_by_region.get(region)
+        if rule is None:
+            continue
+        national = digits
+        has_trunk = bool(rule.trunk_prefix) and national.startswith(rule.trunk_prefix)
+        if has_trunk:
+            national = national[len(rule.trunk_prefix):]
+        if not fits(rule, national):
+            continue
+        mobile = is_mobile(rule, national)
+        # Without a country code or trunk prefix only a mobile number is distinctive enough
+        if has_trunk or mobile or not rule.trunk_prefix and not rule.mobile_prefixes:
+            accepted.setdefault(f"+{rule.country_code}{national}", (mobile, rule))
+    mobiles = [number for number, (mobile, _) in accepted.items() if mobile]
+    if len(accepted) > 1:
+        # A single mobile reading still wins when every other region knows its mobile prefixes and
+        # rules that out (050... is a UAE mobile, not a UK landline); 98xxxxxxxx is an Indian mobile
+        # but also a valid US number, and the US numbering plan has no mobile prefixes to tell
+        if len(mobiles) == 1 and all(rule.mobile_prefixes for number, (_, rule) in accepted.items() if number not in mobiles):
+            return mobiles[0], True, False
+        return raw, bool(mobiles), False
+    if accepted:
+        (number, (mobile, _)), = accepted.items()
+        return number, mobile, False
+    return None
+
+
+def phone_candidates(text):
+    """Yields (score, E.164 number) for every valid number in the case-folded text."""
+    for match in candidate_pattern.finditer(text):
+        raw = match.group().rstrip(' \t(.-')
+        digits = re.sub(r'\D', '', raw)
+        # Long digit runs are tables, IDs or several numbers glued together
+        if not 6 <= len(digits) <= MAX_DIGITS + 2:
+            continue
+        parsed = to_e164(raw, digits)
+        if parsed is None:
+            continue
+        number, mobile, international = parsed
+
+        start = match.start()
+        line_start = text.rfind('\n', max(0, start - LABEL_WINDOW), start) + 1
+        before = text[max(line_start, start - LABEL_WINDOW):start]
+        score = 0.0
+        if fax_label.search(before):
+            score -= 5
+        elif phone_label.search(before):
+            score += 3
+        score += mobile + international
+        score += 1 - start / len(text)  # Earlier (the header) wins ties
+        yield score, number
+
+
+# Function to extract the most likely phone number from case-folded text, normalized to E.164
+def extract_phone(text):
+    best = max(phone_candidates(text), default=None, key=lambda candidate: candidate[0])
+    return best[1] if best else "Not Found"
@@ -0,0 +1,60 @@
+import cProfile
+import glob
+import os
+import pstats
+import shutil
+import uuid
+from contextlib import contextmanager
+
+# Profiling is off unless enabled here; a request then opts in with the X-Profile header or ?profile=1
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+# When set, the header or parameter has to carry this value instead of "1"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILE_REPORT_LINES = int(os.getenv("PROFILE_REPORT_LINES", 60))
+
+
+def profiling_requested(value):
+    if not PROFILING_ENABLED or not value:
+        return False
+    if PROFILING_TOKEN:
+        return value == PROFILING_TOKEN
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def profiled_call(func, directory, item):
+    """Runs func(item) under cProfile in a pool worker and saves the stats next to the request's."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, item)
+    finally:
+        profiler.dump_stats(os.path.join(directory, f"worker-{os.getpid()}-{uuid.uuid4().hex}.prof"))
+
+
+@contextmanager
+def profile_request(directory):
+    """Profiles the calling thread into `directory`, where other threads and pool workers add their own stats."""
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(directory, f"thread-{uuid.uuid4().hex}.prof"))
+
+
+def merge_profiles(directory, output_file):
+    """
+    Merges the thread and worker stats in `directory` into one pstats file plus a text
+    report (output_file with .txt), then removes the per-process files.
+    """
+    parts = sorted(glob.glob(os.path.join(directory, '*.prof')))
+    stats = pstats.Stats(*parts)
+    stats.dump_stats(output_file)
+    with open(os.path.splitext(output_file)[0] + '.txt', 'w') as report:
+        workers = sum(os.path.basename(part).startswith('worker-') for part in parts)
+        print(f"Merged from {len(parts)} profile(s): {len(parts) - workers} thread(s) and {workers} worker call(s)\n",
+              file=report)
+        pstats.Stats(output_file, stream=report).sort_stats('cumulative').print_stats(PROFILE_REPORT_LINES)
+    shutil.rmtree(directory, ignore_errors=True)
+    return output_file
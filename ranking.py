@@ -0,0 +1,75 @@
+import re
+
+import numpy as np
+
+from normalize import fold_case
+
+# Common words that say nothing about a candidate's fit for a job
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it', 'its',
+    'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to', 'was', 'we', 'will', 'with', 'you', 'your',
+    'who', 'can', 'all', 'any', 'other', 'must', 'should', 'such', 'able', 'work', 'role', 'job', 'years',
+}
+
+# BM25 parameters: k1 limits how much repeating a term helps, b how much long CVs are penalised
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+token_pattern = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+
+# Function to split case-folded text into words, leaving out stop words
+def tokenize(text):
+    return [token for token in token_pattern.findall(text) if token not in STOP_WORDS]
+
+
+# Function to list the distinct terms of a job description (the query every resume is scored against)
+def query_terms(job_description):
+    return sorted(set(tokenize(fold_case(job_description))))
+
+
+def term_counts(text, terms):
+    """
+    Returns [document length, count of terms[0], count of terms[1], ...] for one resume's case-folded text.
+    This is all BM25 needs, so workers only send back a few numbers instead of the full text.
+    """
+    tokens = tokenize(text)
+    positions = {term: index for index, term in enumerate(terms, 1)}
+    counts = [0] * (len(terms) + 1)
+    counts[0] = len(tokens)
+    for token in tokens:
+        index = positions.get(token)
+        if index:
+            counts[index] += 1
+    return counts
+
+
+def bm25_scores(counts):
+    """
+    Scores every resume of a batch in one set of matrix operations.
+    counts is a list of term_counts() results; returns one score per resume.
+    """
+    matrix = np.asarray(counts, dtype=np.float64).reshape(len(counts), -1)
+    if matrix.size == 0:
+        return np.zeros(len(counts))
+    lengths, tf = matrix[:, 0], matrix[:, 1:]
+
+    document_count = len(matrix)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((document_count - df + 0.5) / (df + 0.5))
+    average_length = lengths.mean() or 1.0
+
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ idf
+
+
+def rank_rows(rows, counts):
+    """
+    Scores rows with BM25 from their term_counts(), appends the score to each row and
+    returns the rows sorted from best to worst match.
+    """
+    if not rows:
+        return []
+    scores = bm25_scores(counts)
+    order = np.argsort(-scores, kind='stable')
+    return [tuple(rows[index]) + (round(float(scores[index]), 4),) for index in order]
@@ -0,0 +1,498 @@
+import multiprocessing
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from functools import cached_property, partial
+
+import docx
+import openpyxl
+import pdfplumber
+from pdfplumber.utils import cluster_objects
+
+from normalize import NormalizedText, fold_case
+from sections import heading_pattern, heading_to_section, segment_sections
+from skills import extract_skills
+from phone import extract_phone, phone_candidates
+from ranking import term_counts, rank_rows
+from dedupe import minhash_signature
+
+# Mapping country names to nationalities
+country_to_nationality = {
+    "United States": "American", "USA": "American", "India": "Indian", "Canada": "Canadian",
+    "United Kingdom": "British", "UK": "British", "Australia": "Australian", "Germany": "German",
+    "France": "French", "Spain": "Spanish", "Italy": "Italian", "China": "Chinese", "Japan": "Japanese",
+    "South Korea": "Korean", "Brazil": "Brazilian", "Mexico": "Mexican", "Russia": "Russian",
+    "Netherlands": "Dutch", "Turkey": "Turkish", "Sweden": "Swedish", "Norway": "Norwegian",
+    "Denmark": "Danish", "Finland": "Finnish", "Switzerland": "Swiss", "South Africa": "South African",
+    "Argentina": "Argentinian", "Egypt": "Egyptian", "Saudi Arabia": "Saudi", 
+    "United Arab Emirates": "Emirati", "UAE": "Emirati"
+}
+
+
+# Define a list of common job title keywords
+job_keywords = [
+    "Manager", "Engineer", "Developer", "Doctor", "Consultant", "Coordinator",
+    "Specialist", "Analyst", "Nurse", "Architect", "Technician", "Lead", "Director", "Executive", "Trainer", "Scientist",
+    "Assistant", "Supervisor", "Administrator", "Clerk", "Operator", "Officer", "Designer", "Trainer", "Technologist",
+    "Chef", "Sales", "Accountant", "Business Analyst", "Project Manager", "Program Manager", "Product Manager", "Legal Advisor",
+    "Social Worker", "Researcher", "Marketing", "HR", "Director", "Chief", "Chief Executive Officer", "CFO", "COO", "CTO",
+    "Software Engineer", "Web Developer", "Data Scientist", "System Analyst", "IT Manager", "Business Development", "Chief Marketing Officer",
+    "UX Designer", "Product Designer", "Data Analyst", "Business Development Manager", "Digital Marketing", "Account Executive",
+    "Financial Analyst", "Security Specialist", "HR Manager", "Operations Manager", "Quality Analyst", "Risk Manager", "IT Specialist",
+    "Sales Manager", "Customer Support", "Logistics Manager", "Project Coordinator", "Public Relations", "Copywriter", "Content Writer",
+    "Photographer", "Videographer", "Consulting Analyst", "Security Consultant", "Healthcare Consultant", "Marketing Consultant",
+    "SEO Specialist", "UX/UI Designer", "Event Coordinator", "Facilities Manager", "Office Manager", "Customer Service Representative",
+    "Research Analyst", "Teacher", "Instructor", "Professor", "Lecturer", "Academic Advisor", "Instructional Designer", "Counselor",
+    "Chief Information Officer", "Software Developer", "Field Engineer", "Maintenance Engineer", "Systems Administrator", "Network Engineer",
+    "Recruiter", "Event Planner", "Data Entry", "Technician", "Help Desk", "Support Engineer", "Financial Controller", "Health Educator",
+    "Project Director", "Creative Director", "Brand Manager", "Talent Manager", "Business Partner", "Product Specialist", "SEO Manager"
+]
+
+# PDFs with at least this many pages are read by several worker processes
+PARALLEL_PDF_PAGE_THRESHOLD = int(os.getenv("PARALLEL_PDF_PAGE_THRESHOLD", 40))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", 10))
+
+# Combined PDFs (e.g. ATS bulk exports) are split into one record per candidate
+SPLIT_COMBINED_PDFS = os.getenv("SPLIT_COMBINED_PDFS", "1") == "1"
+HEADER_LINES = 5  # Lines at the top of a page searched for a new candidate's contact block
+SEGMENT_PARALLEL_THRESHOLD = int(os.getenv("SEGMENT_PARALLEL_THRESHOLD", 8))
+
+# The name is looked for in the top NAME_REGION of page 1 (PDF) or the first NAME_PARAGRAPHS paragraphs (DOCX)
+NAME_REGION = float(os.getenv("NAME_REGION", 0.3))
+NAME_PARAGRAPHS = 10
+
+# Words to ignore in filename
+IGNORE_WORDS = {'resume', 'cv', 'curriculum', 'vitae', 'application', 'letter'}  # Add more as needed
+
+
+
+def clean_filename(file_name):
+    """
+    Removes ignored words and numbers from the filename.
+    Returns the cleaned name if it contains more than 3 letters.
+    """
+    words = re.split(r'[\s\W_]+', file_name)  # Split by space, special characters, and underscores
+    cleaned_words = [word for word in words if word.lower() not in IGNORE_WORDS and not word.isdigit()]
+    cleaned_name = " ".join(cleaned_words)  # Rejoin the words
+    return cleaned_name if len(cleaned_name) > 3 else None
+
+def name_similarity(extracted_name, file_name):
+    """
+    Compares the extracted name with the filename based on multiple conditions.
+    If the similarity score is greater than 0.5, return extracted_name.
+    If filename contains extracted_name or vice versa, return extracted_name.
+    If the extracted name contains any numbers, return the file name.
+    If the file name appears in the entire file content, return the filename.
+    Otherwise, return "Not Found".
+    """
+    if not extracted_name and not file_name:
+        return "Not Found"  # Return "Not Found" if both name and file name are missing
+
+    file_name_base = os.path.splitext(file_name)[0]  # Remove file extension
+    file_name_cleaned = clean_filename(file_name_base)  # Clean filename
+
+    # 1. If extracted_name contains any number, return file_name
+    if re.search(r'\d', extracted_name):  # If extracted_name contains a digit
+        return file_name_cleaned
+
+    # 2. Compare extracted_name and file_name similarity score
+    extracted_lower, file_name_lower = extracted_name.lower(), file_name_base.lower()
+    similarity_score = SequenceMatcher(None, extracted_lower, file_name_lower).ratio()
+    if similarity_score > 0.5:
+        return extracted_name
+
+    # 3. Check if file_name contains extracted_name or extracted_name contains file_name
+    if extracted_lower in file_name_lower or file_name_lower in extracted_lower:
+        return extracted_name
+
+    # 4. Check if the entire file contains the file_name (use the cleaned version for comparison)
+    if file_name_cleaned and file_name_cleaned in extracted_lower:
+        return file_name_cleaned
+
+    # 5. If none of the above, return extracted_name (default behavior)
+    return extracted_name
+
+# The lookbehind lets a match start only at the beginning of a run of address characters;
+# without it a long run with no "@" is rescanned from every position (quadratic time)
+email_pattern = re.compile(r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# Function to extract email
+def extract_email(text):
+    email = email_pattern.search(text)
+    return email.group() if email else "Not Found"
+
+MAX_NAME_LENGTH = 100  # Longer first lines are cut, so name_similarity never compares huge strings
+
+# Function to extract name (assuming it is in the first non-empty line)
+def extract_name(text):
+    lines = text.splitlines()
+    for line in lines:
+        if line.strip():
+            return line.strip()[:MAX_NAME_LENGTH]
+    return None
+
+# Function to check that a line could be the candidate's name rather than a heading or a job title
+def is_name_candidate(line):
+    folded = line.casefold()
+    return (looks_like_name(line) and not heading_pattern.match(line.strip())
+            and not job_pattern.search(folded) and not IGNORE_WORDS & set(re.split(r'\W+', folded)))
+
+def pdf_title_lines(file_path):
+    """
+    Returns (font size, top, text) for every run of same-size words in the top NAME_REGION of
+    page 1. Runs are split at font size changes and wide gaps, so a name next to an address
+    column stays on its own. Only the first page is parsed.
+    """
+    with pdfplumber.open(file_path) as pdf:
+        if not pdf.pages:
+            return []
+        page = pdf.pages[0]
+        x0, top, x1, bottom = page.bbox
+        words = page.crop((x0, top, x1, top + (bottom - top) * NAME_REGION)).extract_words(extra_attrs=['size'])
+
+    lines = []
+    for row in cluster_objects(words, 'top', 3):
+        row.sort(key=lambda word: word['x0'])
+        run = [row[0]]
+        for word in row[1:]:
+            if abs(word['size'] - run[-1]['size']) < 0.5 and word['x0'] - run[-1]['x1'] < word['size'] * 1.5:
+                run.append(word)
+            else:
+                lines.append(run)
+                run = [word]
+        lines.append(run)
+    return [(round(run[0]['size'], 1), run[0]['top'], ' '.join(word['text'] for word in run)) for run in lines]
+
+def docx_title_lines(file_path):
+    """Returns (font size, position, text) for the first NAME_PARAGRAPHS non-empty paragraphs."""
+    paragraphs = [paragraph for paragraph in docx.Document(file_path).paragraphs if paragraph.text.strip()]
+    lines = []
+    for position, paragraph in enumerate(paragraphs[:NAME_PARAGRAPHS]):
+        sizes = [run.font.size.pt for run in paragraph.runs if run.font.size]
+        # Without a size on the runs the paragraph style (or the style it is based on) decides
+        style = paragraph.style
+        while style is not None and style.font.size is None:
+            style = style.base_style
+        size = max(sizes) if sizes else style.font.size.pt if style is not None else 0
+        lines.append((size, position, paragraph.text.strip()))
+    return lines
+
+# Function to extract the name from the layout: the most prominent name-like line at the top of the first page
+def extract_layout_name(file_path):
+    """Returns the largest (then highest) line that looks like a person's name, or None."""
+    lines = pdf_title_lines(file_path) if file_path.lower().endswith('.pdf') else docx_title_lines(file_path)
+    names = [(-size, top, text) for size, top, text in lines if is_name_candidate(text)]
+    return min(names)[2][:MAX_NAME_LENGTH] if names else None
+
+# Country names and the "Nationality:" label, matched in one pass over case-folded text
+country_pattern = re.compile(
+    r'\b(' + '|'.join(sorted((re.escape(country.lower()) for country in country_to_nationality), key=len, reverse=True)) + r')\b')
+nationality_by_country = {country.lower(): nationality for country, nationality in country_to_nationality.items()}
+nationality_label = re.compile(r'nationality[:\-]?\s*(\w+)')
+
+# Function to extract nationality based on country mention (expects case-folded text)
+def extract_nationality(text, country_text=None):
+    nationality_match = nationality_label.search(text)
+    if nationality_match:
+        return nationality_match.group(1).capitalize()
+
+    # Countries are only looked up in country_text when given (a label is trusted anywhere)
+    if country_text is None:
+        country_text = text
+    # dict.fromkeys drops repeats but keeps the order countries were mentioned in
+    found_countries = list(dict.fromkeys(nationality_by_country[match.group(1)]
+                                         for match in country_pattern.finditer(country_text)))
+    if len(found_countries) > 1:
+        return ", ".join(found_countries)
+
+    return found_countries[0] if found_countries else "Not Found"
+
+# Job keywords compiled once; the text is already case-folded so no IGNORECASE is needed
+job_pattern = re.compile(r'\b(?:' + '|'.join(re.escape(keyword.lower()) for keyword in job_keywords) + r')\b')
+
+def extract_designation_simple(text):
+    """
+    Extracts job titles/designations from the given case-folded text using predefined job-related keywords.
+    """
+    job_titles = job_pattern.findall(text)
+
+    # Remove duplicates by converting to a set and back to a list
+    job_titles = list(set([title.capitalize() for title in job_titles]))
+    
+    # If no job title is found, return "Not Found"
+    if job_titles:
+        return ", ".join(job_titles)
+    return "Not Found"
+
+# Function to decide how many processes read one PDF (or its candidates). Inside a pool worker
+# (web app, queue worker, backfill, watcher) the other workers may be busy too, so only the CPUs
+# idle right now are used, plus the caller's own, which just waits; checked per call because a
+# forked worker inherits the parent's module globals
+def pdf_workers():
+    if multiprocessing.parent_process() is None:
+        return PDF_WORKERS
+    try:
+        busy = os.getloadavg()[0]
+    except (AttributeError, OSError):  # No load average (Windows): assume the other workers are busy
+        return 1
+    idle = (os.cpu_count() or 1) - busy
+    return max(1, min(PDF_WORKERS, int(idle) + 1))
+
+# Function to read the text of a range of PDF pages (runs inside a worker process)
+def read_pdf_range(file_path, start, end):
+    with pdfplumber.open(file_path) as pdf:
+        return [page.extract_text() or '' for page in pdf.pages[start:end]]
+
+# Function to read PDF file page by page
+def read_pdf_pages(file_path):
+    """
+    Returns the text of every page in page order.
+    PDFs with PARALLEL_PDF_PAGE_THRESHOLD pages or more are split into chunks of
+    PDF_PAGES_PER_CHUNK pages which are read in parallel by pdf_workers() processes.
+    """
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        if page_count < PARALLEL_PDF_PAGE_THRESHOLD or pdf_workers() < 2:
+            return [page.extract_text() or '' for page in pdf.pages]
+
+    starts = list(range(0, page_count, PDF_PAGES_PER_CHUNK))
+    ends = [min(start + PDF_PAGES_PER_CHUNK, page_count) for start in starts]
+    workers = min(pdf_workers(), len(starts))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = pool.map(read_pdf_range, [file_path] * len(starts), starts, ends)
+        # map() yields chunks in submission order, so pages stay in order
+        return [text for chunk in chunks for text in chunk]
+
+# Function to read PDF file
+def read_pdf(file_path):
+    return ''.join(read_pdf_pages(file_path))
+
+# Function to read DOCX file
+def read_docx(file_path):
+    doc = docx.Document(file_path)
+    return '\n'.join(para.text for para in doc.paragraphs)
+
+# Function to check if a line looks like a person's name (a short run of alphabetic words)
+def looks_like_name(line):
+    words = line.split()
+    return 2 <= len(words) <= 4 and all(re.fullmatch(r"[A-Za-z][A-Za-z.'-]*", word) for word in words)
+
+# Function to find the contact details at the top of a page, and whether the page opens with a name
+def page_header_contacts(page_text):
+    lines = [line.strip() for line in page_text.splitlines() if line.strip()][:HEADER_LINES]
+    header = fold_case('\n'.join(lines))
+    # Only valid emails and phone numbers count; registration numbers and dates do not
+    contacts = set(email_pattern.findall(header))
+    contacts.update(number for _, number in phone_candidates(header))
+    starts_with_name = bool(lines) and is_name_candidate(lines[0])
+    return contacts, starts_with_name
+
+# Sections whose entries carry other people's names and contact details (referees, employers)
+CONTACT_SECTIONS = {'references', 'experience'}
+
+def split_candidates(pages):
+    """
+    Splits the pages of a combined PDF into one text segment per candidate.
+    A new candidate starts on a page whose first line is a name followed by an email or
+    phone number not seen in the current candidate's pages, so CVs that repeat their own
+    header on every page are kept together. A page continuing a references or experience
+    section never starts a candidate: referee and employer blocks look just like a header.
+    """
+    segments = []
+    current_pages = []
+    current_contacts = set()
+    section = 'header'  # Section the current candidate's last page ended in
+    for page_text in pages:
+        contacts, starts_with_name = page_header_contacts(page_text)
+        if (current_pages and starts_with_name and contacts and not contacts & current_contacts
+                and section not in CONTACT_SECTIONS):
+            segments.append(''.join(current_pages))
+            current_pages = []
+            current_contacts = set()
+            section = 'header'
+        current_pages.append(page_text)
+        current_contacts.update(contacts)
+        headings = heading_pattern.findall(page_text)
+        if headings:
+            section = heading_to_section[headings[-1].lower()]
+    if current_pages:
+        segments.append(''.join(current_pages))
+    return segments
+
+# A resume (or one candidate's part of a combined PDF) whose text is only read when a stage asks for it
+class ResumeDocument:
+    def __init__(self, file_path, file_name=None, text=None):
+        self.file_path = file_path
+        self.file_name = file_name  # None for candidates split out of a combined PDF
+        self.whole_file = text is None
+        if text is not None:
+            self.raw_text = text
+
+    @cached_property
+    def pages(self):
+        if self.file_path.lower().endswith('.pdf'):
+            return read_pdf_pages(self.file_path)
+        return [read_docx(self.file_path)]
+
+    # Read from page 1 alone, so the name never makes the rest of the document load
+    @cached_property
+    def layout_name(self):
+        return extract_layout_name(self.file_path) if self.whole_file else None
+
+    @cached_property
+    def raw_text(self):
+        return ''.join(self.pages)
+
+    # Normalized once per document; every stage reads text (original case) or folded (case-folded)
+    @cached_property
+    def normalized(self):
+        return NormalizedText(self.raw_text)
+
+    @property
+    def text(self):
+        return self.normalized.text
+
+    @property
+    def folded(self):
+        return self.normalized.folded
+
+    @cached_property
+    def sections(self):
+        return segment_sections(self.text)
+
+    def section_text(self, *names, folded=False):
+        """Text of the named sections, or the whole text when the resume has none of them."""
+        source = self.folded if folded else self.text
+        return self.sections.text_for(*names, source=source) or source
+
+# Function to pick the candidate's name, checked against the filename when there is one
+def name_field(doc):
+    # The first line of the text is only a fallback for files whose layout shows no name
+    extracted_name = doc.layout_name or extract_name(doc.section_text('header'))
+    if doc.file_name is None:
+        return extracted_name or "Not Found"
+    return name_similarity(extracted_name or '', doc.file_name)
+
+# Contact details are looked for in the header first, then anywhere except the references
+def email_field(doc):
+    email = extract_email(doc.section_text('header', 'personal'))
+    return email if email != "Not Found" else extract_email(doc.sections.text_without('references'))
+
+def phone_field(doc):
+    phone = extract_phone(doc.section_text('header', 'personal', folded=True))
+    return phone if phone != "Not Found" else extract_phone(doc.sections.text_without('references', source=doc.folded))
+
+# Country names in education or experience (universities, employers) are not the candidate's nationality,
+# but a "Nationality:" label is, wherever the sections put it
+def nationality_field(doc):
+    return extract_nationality(doc.folded, doc.section_text('header', 'personal', 'summary', folded=True))
+
+# Titles in the references or education sections belong to other people or to degrees
+def designation_field(doc):
+    return extract_designation_simple(doc.section_text('header', 'summary', 'experience', folded=True))
+
+# Skills are listed all over a CV, but the references section describes other people
+def skills_field(doc):
+    return extract_skills(doc.sections.text_without('references', source=doc.folded),
+                          doc.sections.text_without('references', source=doc.text))
+
+# Extraction stages in column order: each takes a ResumeDocument and returns one cell
+Field = namedtuple('Field', ['header', 'extract', 'needs_text'])
+FIELDS = {
+    'name': Field("Name", name_field, False),
+    'email': Field("Email", email_field, True),
+    'phone': Field("Phone Number", phone_field, True),
+    'nationality': Field("Nationality", nationality_field, True),
+    'designation': Field("Designation", designation_field, True),
+    'skills': Field("Skills", skills_field, True),
+}
+
+def parse_fields(values):
+    """
+    Turns requested field names (a list of names and/or comma separated names) into
+    the selected fields in column order. Unknown names are ignored; nothing selected means every field.
+    """
+    requested = {name.strip().lower() for value in values for name in value.split(',')}
+    return [name for name in FIELDS if name in requested] or list(FIELDS)
+
+# Function to run the selected stages on one document
+def extract_row(doc, fields, terms=None, minhash=False):
+    row = tuple(FIELDS[field].extract(doc) for field in fields)
+    # Batch-level data, turned into columns by finish_rows() once the whole batch is done
+    extras = {}
+    if terms:
+        extras['terms'] = term_counts(doc.folded, terms)
+    if minhash:
+        extras['minhash'] = minhash_signature(doc.folded)
+    return row + (extras,) if extras else row
+
+# Function to extract one candidate of a combined PDF (runs inside a worker process)
+def extract_segment(text, file_path, fields, terms=None, minhash=False):
+    return extract_row(ResumeDocument(file_path, text=text), fields, terms, minhash)
+
+# Function to process a single resume and extract data
+def process_resume(file_path, fields=None, terms=None, minhash=False):
+    """
+    Returns one row per candidate in the file, holding only the selected fields.
+    Combined PDFs holding several CVs are split with split_candidates() and their
+    segments are processed in parallel.
+    With terms (ranking.query_terms() of a job description) and/or minhash, every row
+    ends with a dict of the data finish_rows() needs for the Score and Duplicate Group columns.
+    """
+    fields = fields or list(FIELDS)
+    # Scanners and mail gateways often write upper-case extensions (SCAN001.PDF)
+    if not file_path.lower().endswith(('.pdf', '.docx')):
+        print(f"Unsupported file type: {file_path}")
+        return []
+
+    doc = ResumeDocument(file_path, file_name=os.path.basename(file_path))
+
+    # Splitting needs every page, so it only runs when the text is read anyway
+    if SPLIT_COMBINED_PDFS and file_path.lower().endswith('.pdf') and (terms or minhash or any(FIELDS[field].needs_text for field in fields)):
+        segments = split_candidates(doc.pages)
+        if len(segments) > 1:
+            extract = partial(extract_segment, file_path=file_path, fields=fields, terms=terms, minhash=minhash)
+            if len(segments) >= SEGMENT_PARALLEL_THRESHOLD and pdf_workers() > 1:
+                with ProcessPoolExecutor(max_workers=min(pdf_workers(), len(segments))) as pool:
+                    return list(pool.map(extract, segments, chunksize=4))
+            return [extract(segment) for segment in segments]
+
+    return [extract_row(doc, fields, terms, minhash)]
+
+def finish_rows(keyed_rows, terms=None, duplicate_index=None):
+    """
+    Turns the (key, row) pairs of a finished batch into export rows: adds the Duplicate Group
+    column from duplicate_index and, when ranking, the Score column sorted best first.
+    Keys identify each row in the duplicate index, so finishing a batch twice is harmless.
+    """
+    if not terms and duplicate_index is None:
+        return [row for _, row in keyed_rows]
+
+    rows = [row[:-1] for _, row in keyed_rows]
+    extras = [row[-1] for _, row in keyed_rows]
+    if duplicate_index is not None:
+        groups = duplicate_index.assign_groups([(key, extra['minhash']) for (key, _), extra in zip(keyed_rows, extras)])
+        rows = [row + (group or '',) for row, group in zip(rows, groups)]
+    if terms:
+        rows = rank_rows(rows, [extra['terms'] for extra in extras])
+    return rows
+
+# Function to create and save data into an Excel file
+def create_excel(data, output_file, fields=None, ranked=False, duplicates=False):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Resume Data"
+
+    headers = [FIELDS[field].header for field in fields or FIELDS]
+    if duplicates:
+        headers.append("Duplicate Group")
+    if ranked:
+        headers.append("Score")
+    ws.append(headers)
+    for row in data:
+        ws.append(row)
+
+    wb.save(output_file)
@@ -0,0 +1,169 @@
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+class SchedulerError(Exception):
+    """The item could not be run (pool or queue failure); unlike an error raised by func it is worth retrying."""
+
+
+class WorkerCrashed(SchedulerError):
+    """The worker process running the item died (e.g. killed for using too much memory), also when run alone."""
+
+
+class Batch:
+    """
+    A group of files submitted together by one user.
+    Results are kept in submission order; wait() blocks until every file is done.
+    """
+
+    def __init__(self, user, func, items, on_result=None, on_error=None):
+        self.user = user
+        self.func = func
+        self.on_result = on_result
+        self.on_error = on_error
+        self.items = list(items)
+        self.results = [None] * len(self.items)
+        self.errors = [None] * len(self.items)
+        self.remaining = len(self.items)
+        self.done = threading.Event()
+        if not self.items:
+            self.done.set()
+
+    def finish(self, index, result=None, error=None):
+        self.results[index] = result
+        self.errors[index] = error
+
+    def wait(self):
+        self.done.wait()
+        for error in self.errors:
+            if error is not None:
+                raise error
+        return self.results
+
+
+class FairScheduler:
+    """
+    Runs jobs from several users on a shared process pool.
+    Each user has their own queue and users are served round-robin, so a small batch
+    is interleaved with a large one instead of waiting behind it. A user gets up to
+    `weights[user]` jobs per turn (default 1) and never more than `per_user_limit`
+    jobs running at the same time.
+    """
+
+    def __init__(self, workers, per_user_limit=None, weights=None):
+        self.workers = max(1, workers)
+        self.per_user_limit = per_user_limit or self.workers
+        self.weights = weights or {}
+        self.queues = {}       # user -> deque of (batch, index)
+        self.running = {}      # user -> number of jobs currently running
+        self.rotation = deque()  # users with queued jobs, in turn order
+        self.turn_used = 0     # jobs taken by the user at the front of the rotation this turn
+        self.condition = threading.Condition()
+        self.pool = None
+        self.threads = []
+
+    def start(self):
+        # The pool and dispatch threads are created on first use so importing the app stays cheap
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self.dispatch_loop, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def replace_pool(self, broken):
+        # A worker that dies breaks the whole executor; later submissions would all fail
+        with self.condition:
+            if self.pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def execute(self, func, item):
+        """
+        Runs func(item) on the pool. Errors raised by func itself are passed through unchanged.
+        When a worker process dies every item in flight fails with it, so the pool is rebuilt
+        and the item is run again on a process of its own: only the item that keeps killing
+        its worker ends with WorkerCrashed, the others just finish.
+        """
+        pool = self.pool
+        try:
+            return pool.submit(func, item).result()
+        except BrokenProcessPool:
+            self.replace_pool(pool)
+        except RuntimeError as error:
+            # Raised by submit() on a pool another thread has just shut down, or by func itself
+            if pool is self.pool:
+                raise
+
+        try:
+            with ProcessPoolExecutor(max_workers=1) as isolated:
+                return isolated.submit(func, item).result()
+        except BrokenProcessPool:
+            raise WorkerCrashed("The worker process died while processing this file") from None
+
+    def submit(self, user, func, items, on_result=None, on_error=None):
+        """
+        Queues func(item) for every item and returns the Batch tracking them.
+        on_result(index, result) or on_error(index, error) is called as soon as each item finishes;
+        error is what func raised, or a SchedulerError when the item could not be run.
+        """
+        batch = Batch(user, func, items, on_result, on_error)
+        with self.condition:
+            self.start()
+            queue = self.queues.setdefault(user, deque())
+            queue.extend((batch, index) for index in range(len(batch.items)))
+            if queue and user not in self.rotation:
+                self.rotation.append(user)
+            self.condition.notify_all()
+        return batch
+
+    def next_job(self):
+        """Picks the next job in round-robin order, skipping users at their concurrency cap."""
+        for _ in range(len(self.rotation)):
+            user = self.rotation[0]
+            if self.running.get(user, 0) < self.per_user_limit:
+                batch, index = self.queues[user].popleft()
+                self.running[user] = self.running.get(user, 0) + 1
+                self.turn_used += 1
+                if not self.queues[user]:
+                    del self.queues[user]
+                    self.rotation.popleft()
+                    self.turn_used = 0
+                elif self.turn_used >= self.weights.get(user, 1):
+                    self.rotation.rotate(-1)
+                    self.turn_used = 0
+                return batch, index
+            self.rotation.rotate(-1)
+            self.turn_used = 0
+        return None
+
+    def dispatch_loop(self):
+        while True:
+            with self.condition:
+                job = self.next_job()
+                while job is None:
+                    self.condition.wait()
+                    job = self.next_job()
+            batch, index = job
+
+            try:
+                result = self.execute(batch.func, batch.items[index])
+                if batch.on_result:
+                    batch.on_result(index, result)
+                batch.finish(index, result=result)
+            except Exception as error:
+                try:
+                    if batch.on_error:
+                        batch.on_error(index, error)
+                except Exception as callback_error:
+                    # The dispatch thread has to survive, or the batch would never be done
+                    print(f"Failed to report an error for item {index} of a batch: {callback_error}")
+                batch.finish(index, error=error)
+
+            with self.condition:
+                self.running[batch.user] -= 1
+                batch.remaining -= 1
+                if batch.remaining == 0:
+                    batch.done.set()
+                self.condition.notify_all()
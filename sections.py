@@ -0,0 +1,66 @@
+import re
+from collections import namedtuple
+
+# Headings that start each section, matched case-insensitively on a line of their own
+SECTION_HEADINGS = {
+    'summary': ["Summary", "Professional Summary", "Career Summary", "Profile", "Professional Profile",
+                "Objective", "Career Objective", "About Me"],
+    'experience': ["Experience", "Work Experience", "Professional Experience", "Employment History",
+                   "Employment", "Work History", "Career History", "Relevant Experience"],
+    'education': ["Education", "Educational Qualifications", "Academic Qualifications", "Qualifications",
+                  "Academic Background", "Education and Training"],
+    'skills': ["Skills", "Key Skills", "Technical Skills", "Core Competencies", "Competencies",
+               "Areas of Expertise", "Skills and Abilities"],
+    'personal': ["Personal Details", "Personal Information", "Personal Data", "Personal Profile",
+                 "Contact", "Contact Details", "Contact Information"],
+    'references': ["References", "Referees"],
+    'other': ["Projects", "Certifications", "Certificates", "Courses", "Training", "Languages",
+              "Achievements", "Awards", "Publications", "Hobbies", "Interests", "Declaration"],
+}
+
+heading_to_section = {heading.lower(): name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# One pass over the text finds every heading line, e.g. "WORK EXPERIENCE" or "Education:"
+heading_pattern = re.compile(
+    r'^[ \t]*(' + '|'.join(sorted(map(re.escape, heading_to_section), key=len, reverse=True)) + r')[ \t]*:?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE)
+
+Section = namedtuple('Section', ['name', 'start', 'end'])
+
+
+class SectionIndex:
+    """
+    The sections of one resume as character offsets into its text.
+    Everything before the first heading is the 'header' (name and contact block).
+    A section name can occur more than once, e.g. two "Experience" blocks.
+    """
+
+    def __init__(self, text, sections):
+        self.text = text
+        self.sections = sections
+
+    def text_for(self, *names, source=None):
+        """
+        Returns the text of the named sections joined in document order ('' if none exist).
+        source can be another string with the same offsets, e.g. the case-folded copy.
+        """
+        source = source or self.text
+        return '\n'.join(source[section.start:section.end]
+                         for section in self.sections if section.name in names)
+
+    def text_without(self, *names, source=None):
+        """Returns the text of every section except the named ones."""
+        source = source or self.text
+        return '\n'.join(source[section.start:section.end]
+                         for section in self.sections if section.name not in names)
+
+
+def segment_sections(text):
+    """Parses the text once into a SectionIndex."""
+    sections = []
+    start, name = 0, 'header'
+    for match in heading_pattern.finditer(text):
+        sections.append(Section(name, start, match.start()))
+        start, name = match.end(), heading_to_section[match.group(1).lower()]
+    sections.append(Section(name, start, len(text)))
+    return SectionIndex(text, sections)
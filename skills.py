@@ -0,0 +1,149 @@
+import hashlib
+import os
+import pickle
+from collections import deque
+
+from normalize import fold_case
+
+# Skills taxonomy: one skill per line, optionally followed by synonyms ("Canonical: synonym, synonym");
+# a term written "=Term" only matches with exactly that case
+SKILLS_TAXONOMY = os.getenv("SKILLS_TAXONOMY") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.txt')
+# The built matcher is pickled here so it is not rebuilt on every start
+SKILLS_CACHE = os.getenv("SKILLS_CACHE") or os.path.splitext(SKILLS_TAXONOMY)[0] + '.pkl'
+CACHE_VERSION = 3  # Bump when SkillMatcher or read_taxonomy change so old caches are rebuilt
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over every skill name and synonym in the taxonomy.
+    find() walks the text once, so the cost per document stays roughly flat however
+    many terms the taxonomy holds. Matching is case-insensitive and only whole words count,
+    except for case-sensitive terms (ordinary words such as "Go" or "Swift"), which must match
+    the case as written and are not matched next to a hyphen ("go-getter").
+    """
+
+    def __init__(self, terms):
+        self.skills = []          # canonical skill names, indexed by skill id
+        self.goto = [{}]          # node -> {character: next node}
+        self.fail = [0]
+        self.output = [None]      # node -> (term length, skill id, exact term or None) if a term ends here
+        self.output_link = [0]    # node -> nearest node along the fail chain with an output
+
+        skill_ids = {}
+        for term, skill, case_sensitive in terms:
+            skill_id = skill_ids.setdefault(skill, len(skill_ids))
+            if skill_id == len(self.skills):
+                self.skills.append(skill)
+            self.add_term(fold_case(term), skill_id, term if case_sensitive else None)
+        self.build_links()
+
+    def add_term(self, term, skill_id, exact=None):
+        node = 0
+        for char in term:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.output_link.append(0)
+            node = next_node
+        self.output[node] = (len(term), skill_id, exact)
+
+    def build_links(self):
+        # Breadth-first, so every node's fail target is already final when the node is visited
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fail = self.fail[node]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                target = self.goto[fail].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output_link[child] = target if self.output[target] else self.output_link[target]
+                queue.append(child)
+
+    def find(self, text, cased_text=None):
+        """
+        Returns the canonical skills found in the case-folded text (see normalize.fold_case),
+        in order of first appearance. Case-sensitive terms are checked against cased_text,
+        the same text before folding; without it they match in any case.
+        """
+        found = {}
+        goto, fail, output, output_link = self.goto, self.fail, self.output, self.output_link
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if output[node] else output_link[node]
+            while match:
+                length, skill_id, exact = output[match]
+                start = end - length
+                before = text[start - 1] if start else ' '
+                after = text[end] if end < len(text) else ' '
+                # Whole words only: "Java" must not match inside "JavaScript"
+                if before.isalnum() or after.isalnum():
+                    pass
+                elif exact is None:
+                    found.setdefault(skill_id, start)
+                elif (before != '-' and after != '-'
+                      and (cased_text is None or cased_text[start:end] == exact)):
+                    found.setdefault(skill_id, start)
+                match = output_link[match]
+        return [self.skills[skill_id] for skill_id in sorted(found, key=found.get)]
+
+
+# Function to read (term, canonical skill, case sensitive) triples from the taxonomy file
+def read_taxonomy(path):
+    with open(path, encoding='utf-8') as taxonomy:
+        for line in taxonomy:
+            line = line.strip()
+            if not line or line.startswith('#'):  # Comments are whole lines, since "C#" is a skill
+                continue
+            skill, _, synonyms = line.partition(':')
+            skill = skill.strip()
+            yield skill.lstrip('='), skill.lstrip('='), skill.startswith('=')
+            for synonym in synonyms.split(','):
+                synonym = synonym.strip()
+                if synonym:
+                    yield synonym.lstrip('='), skill.lstrip('='), synonym.startswith('=')
+
+
+def load_matcher(taxonomy_path=SKILLS_TAXONOMY, cache_path=SKILLS_CACHE):
+    """
+    Loads the pickled matcher, rebuilding it (and the cache) when the taxonomy file has changed.
+    """
+    with open(taxonomy_path, 'rb') as taxonomy:
+        digest = f"{CACHE_VERSION}:{hashlib.sha256(taxonomy.read()).hexdigest()}"
+
+    try:
+        with open(cache_path, 'rb') as cache:
+            cached_digest, matcher = pickle.load(cache)
+        if cached_digest == digest:
+            return matcher
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    matcher = SkillMatcher(read_taxonomy(taxonomy_path))
+    # Write to a temporary file first so concurrent workers never read a half-written cache
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as cache:
+        pickle.dump((digest, matcher), cache, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+    return matcher
+
+
+matcher = None
+
+# Function to extract skills from case-folded text using the taxonomy (loaded on first use in each process);
+# cased_text is the text before folding, for case-sensitive terms
+def extract_skills(text, cased_text=None):
+    global matcher
+    if matcher is None:
+        matcher = load_matcher()
+    skills = matcher.find(text, cased_text)
+    return ", ".join(skills) if skills else "Not Found"
@@ -0,0 +1,68 @@
+"""
+Checks that combined-PDF splitting finds every candidate and nothing else.
+
+Synthetic PDFs (ordinary multi-page CVs with referee and employer blocks, and combined
+files of several CVs) are run through process_resume, and the number of rows is compared
+with the number of candidates in the file. Exits with status 1 on failure.
+
+    python split_check.py
+"""
+import os
+import sys
+import tempfile
+
+from resume_parser import process_resume
+from synthetic import make_pdf
+
+
+def cv_pages(name, phone, closing=("Education", "BSc Nursing, University of Kerala, India")):
+    email = f"{name.lower().replace(' ', '.')}@example.com"
+    first = [name, email, f"Mobile: {phone}", "Summary", "Registered Nurse with experience in patient care.",
+             "Experience", "Staff Nurse, City Hospital, Dubai (2018 - 2023)",
+             "Delivered patient care and wound care in a 30-bed ICU."]
+    return [first, ["Charge Nurse, Rashid Hospital, Dubai (2015 - 2018)", "Led a team of 12 nurses.", *closing]]
+
+
+# Name -> (pages, expected rows)
+CASES = {
+    'referee page under a heading': (
+        cv_pages("Jane Doe", "+971 50 123 4567")
+        + [["References", "Mr John Smith", "john.smith@example.com", "+971 4 123 4567"]], 1),
+    'referee page continuing references': (
+        cv_pages("Jane Doe", "+971 50 123 4567", closing=("References", "Dr Mary Jones, Rashid Hospital"))
+        + [["Mr John Smith", "john.smith@example.com", "+971 4 123 4567", "Head of Nursing, City Hospital"]], 1),
+    'employer contact continuing experience': (
+        [cv_pages("Jane Doe", "+971 50 123 4567")[0],
+         ["Ahmed Khan Hospital", "hr@ahmedkhan.example.com", "+971 4 765 4321", "Staff Nurse (2012 - 2015)",
+          "Education", "BSc Nursing, University of Kerala, India"]], 1),
+    'header repeated on every page': (
+        [["Jane Doe", "jane.doe@example.com", "Summary", "Registered Nurse."],
+         ["Jane Doe", "jane.doe@example.com", "Skills", "Wound Care"]], 1),
+    'combined file of three CVs': (
+        cv_pages("Jane Doe", "+971 50 123 4567") + cv_pages("Priya Nair", "+44 7911 123456")
+        + cv_pages("Omar Haddad", "+971 55 765 4321"), 3),
+}
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case, (pages, expected) in CASES.items():
+            path = os.path.join(directory, case.replace(' ', '_') + '.pdf')
+            make_pdf(pages, path)
+            rows = process_resume(path)
+            status = "ok" if len(rows) == expected else "FAILED"
+            print(f"{case:<45} {len(rows)} row(s), expected {expected}  {status}")
+            if len(rows) != expected:
+                failures.append(f"{case}: {[row[0] for row in rows]}")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == "__main__":
+    main()
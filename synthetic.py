@@ -0,0 +1,59 @@
+"""
+Synthetic resume files for performance checks and load tests.
+PDFs are written by hand (one Helvetica text stream per page) so no PDF library is needed.
+"""
+import docx
+
+
+def pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages, path):
+    """Writes a PDF with one page per list of text lines in pages."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        commands = ["BT /F1 10 Tf 12 TL 40 800 Td"]
+        commands += [f"({pdf_escape(line)}) '" for line in lines]
+        commands.append("ET")
+        stream = '\n'.join(commands).encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as pdf:
+        pdf.write(output)
+
+
+def make_docx(lines, path):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+# Function to build the lines of a plausible resume, repeated to reach roughly `size` characters
+def resume_lines(name="Jane Doe", size=3000):
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com", "Mobile: +971 50 123 4567",
+             "Summary", "Registered Nurse with experience in patient care and infection control.",
+             "Experience"]
+    body = ["Staff Nurse, City Hospital, Dubai, United Arab Emirates (2018 - 2023)",
+            "Delivered patient care, medication administration and wound care in a 30-bed ICU.",
+            "Skills: Basic Life Support, Microsoft Excel, Communication, Teamwork"]
+    while sum(len(line) + 1 for line in lines) < size:
+        lines += body
+    return lines + ["Education", "BSc Nursing, University of Kerala, India", "References", "Available on request"]
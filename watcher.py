@@ -0,0 +1,299 @@
+"""
+Ingestion daemon for a drop folder (uploads/ by default).
+
+Watches the folder with inotify (polling where inotify is unavailable) and processes
+every new .pdf/.docx with process_resume as soon as it has stopped changing for
+--settle seconds, so files still being written by a scanner or mail gateway are never
+read half way. Rows are stored in a job journal (the candidate store) and appended to a
+rolling CSV export, one file per day, so new CVs are searchable seconds after they land.
+The journal remembers every file, so a restart only picks up files it has not seen.
+inotify can drop events (its queue overflows under a burst of arrivals), so the whole
+folder is also rescanned after an overflow and every --rescan-interval seconds.
+
+    python watcher.py uploads/ --export-dir jobs/watch
+"""
+import argparse
+import csv
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from resume_parser import FIELDS, parse_fields, process_resume, finish_rows
+from dedupe import DuplicateIndex
+from journal import JobJournal
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+JOB_ID = 'watch'  # Each journal file holds a single watch job
+JOBS_FOLDER = os.getenv("UPLOAD_FOLDER") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs')
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = 0o4000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+class InotifyWatcher:
+    """
+    Reports the names of files created, written or moved into a directory, via inotify through ctypes.
+    After a queue overflow, and every `rescan_interval` seconds, every file in the directory is reported.
+    """
+
+    def __init__(self, directory, rescan_interval=300):
+        self.directory = directory
+        self.rescan_interval = rescan_interval
+        self.last_scan = time.time()
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def changes(self, timeout):
+        """Waits up to `timeout` seconds and returns the set of file names that changed."""
+        names = set()
+        overflow = False
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        while readable:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif name:
+                    names.add(os.fsdecode(name))
+
+        # Events were lost, or may have been: report everything and let the caller skip known files
+        if overflow or (self.rescan_interval and time.time() - self.last_scan >= self.rescan_interval):
+            if overflow:
+                print(f"inotify queue overflowed, rescanning {self.directory}")
+            self.last_scan = time.time()
+            names.update(entry.name for entry in os.scandir(self.directory) if entry.is_file())
+        return names
+
+
+class PollingWatcher:
+    """Fallback for systems (or network shares) without inotify: compares directory listings."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.seen = {}
+
+    def changes(self, timeout):
+        time.sleep(timeout)
+        names = set()
+        current = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                current[entry.name] = (stat.st_size, stat.st_mtime)
+                if self.seen.get(entry.name) != current[entry.name]:
+                    names.add(entry.name)
+        self.seen = current
+        return names
+
+
+def make_watcher(directory, polling=False, rescan_interval=300):
+    if not polling:
+        try:
+            return InotifyWatcher(directory, rescan_interval)
+        except (OSError, AttributeError, TypeError) as error:
+            print(f"inotify unavailable ({error}), polling {directory} instead")
+    return PollingWatcher(directory)
+
+
+class RollingExport:
+    """Appends rows to a CSV file per day in `directory`, writing the header when a new file starts."""
+
+    def __init__(self, directory, headers):
+        self.directory = directory
+        self.headers = headers
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, rows):
+        path = os.path.join(self.directory, f'candidates_{datetime.now().strftime("%Y-%m-%d")}.csv')
+        new_file = not os.path.exists(path)
+        with open(path, 'a', newline='', encoding='utf-8') as export_file:
+            writer = csv.writer(export_file)
+            if new_file:
+                writer.writerow(self.headers)
+            writer.writerows(rows)
+        return path
+
+
+def watch(directory, export_dir, workers, settle, poll_interval, journal_path, fields=None, duplicates_path=None,
+          polling=False, rescan_interval=300):
+    journal = JobJournal(journal_path)
+    duplicate_index = DuplicateIndex(duplicates_path) if duplicates_path else None
+    if journal.get_job(JOB_ID) is None:
+        journal.create_job('watcher', [], job_id=JOB_ID, fields=fields)
+    # Rows already in the journal were extracted with the settings of the first run
+    fields = journal.get_job(JOB_ID)['fields']
+    headers = [FIELDS[field].header for field in fields]
+    if duplicate_index is not None:
+        headers.append("Duplicate Group")
+    export = RollingExport(export_dir, headers + ["File", "Added"])
+
+    watcher = make_watcher(directory, polling, rescan_interval)
+    known = journal.known_files(JOB_ID)
+    # name -> (size, mtime, time it was last seen changing); files already there at startup are candidates too
+    settling = {}
+    changed = {entry.name for entry in os.scandir(directory) if entry.is_file()}
+    print(f"Watching {directory} ({type(watcher).__name__}), exporting to {export_dir}")
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    def run_arrivals(paths):
+        nonlocal pool
+        interrupted = process_arrivals(paths, pool, journal, fields, duplicate_index, export)
+        if interrupted:
+            # A worker process died; the pool is unusable, but the files were not at fault (yet)
+            print(f"A worker process died, restarting the pool and retrying {len(interrupted)} file(s) one at a time")
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = ProcessPoolExecutor(max_workers=workers)
+            retry_interrupted(interrupted, journal, fields, duplicate_index, export)
+
+    try:
+        # Files that were being processed when the daemon stopped
+        interrupted = [file_path for _, file_path in journal.pending_files(JOB_ID)]
+        if interrupted:
+            run_arrivals(interrupted)
+
+        while True:
+            now = time.time()
+            for name in changed:
+                path = os.path.abspath(os.path.join(directory, name))
+                if not name.lower().endswith(SUPPORTED_EXTENSIONS) or name.startswith(('.', '~$')) or path in known:
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    settling.pop(name, None)
+                    continue
+                previous = settling.get(name)
+                if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+                    settling[name] = (stat.st_size, stat.st_mtime, now)
+
+            # Files unchanged for `settle` seconds are complete; check the size once more before reading
+            ready = []
+            for name, (size, mtime, changed_at) in list(settling.items()):
+                if now - changed_at < settle:
+                    continue
+                path = os.path.abspath(os.path.join(directory, name))
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    del settling[name]
+                    continue
+                if (stat.st_size, stat.st_mtime) != (size, mtime):
+                    settling[name] = (stat.st_size, stat.st_mtime, now)
+                    continue
+                del settling[name]
+                ready.append(path)
+
+            if ready:
+                run_arrivals(ready)
+                known.update(ready)
+
+            # Wake up early while files are settling, otherwise wait for the next change
+            changed = watcher.changes(min(settle / 2, poll_interval) if settling else poll_interval)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Function to extract newly arrived files, store their rows and append them to the export.
+# Returns the files left pending because a worker process died (the pool is then broken)
+def process_arrivals(paths, pool, journal, fields, duplicate_index, export):
+    positions = {file_path: position for position, file_path in journal.pending_files(JOB_ID)}
+    new_files = [path for path in paths if path not in positions]
+    if new_files:
+        journal.add_files(JOB_ID, new_files)
+        positions = {file_path: position for position, file_path in journal.pending_files(JOB_ID)}
+    try:
+        futures = {pool.submit(process_resume, path, fields, None, duplicate_index is not None): path
+                   for path in paths}
+    except BrokenProcessPool:
+        return list(paths)
+    interrupted = []
+    for future in as_completed(futures):
+        path = futures[future]
+        position = positions[path]
+        try:
+            rows = future.result()
+        except BrokenProcessPool:
+            # Not the file's fault (or not provably): it stays pending
+            interrupted.append(path)
+            continue
+        except Exception as error:
+            print(f"Failed to process {path}: {error}")
+            journal.record_failure(JOB_ID, position, error)
+            continue
+        journal.record_result(JOB_ID, position, rows)
+        # Same keys as journal.keyed_rows(), so a later full export sees the same duplicate groups
+        rows = finish_rows([(f"{JOB_ID}/{position}/{index}", tuple(row)) for index, row in enumerate(rows)],
+                           duplicate_index=duplicate_index)
+        added = datetime.now().isoformat(timespec='seconds')
+        export_file = export.append([list(row) + [os.path.basename(path), added] for row in rows])
+        print(f"Added {len(rows)} row(s) from {os.path.basename(path)} to {export_file}")
+    return interrupted
+
+
+# Function to rerun files whose worker died, each in a pool of its own, so the files that were
+# only caught up in another file's crash are processed; one that kills its own worker again
+# stays pending for the next start rather than being recorded as failed
+def retry_interrupted(paths, journal, fields, duplicate_index, export):
+    for path in paths:
+        with ProcessPoolExecutor(max_workers=1) as isolated:
+            if process_arrivals([path], isolated, journal, fields, duplicate_index, export):
+                print(f"The worker process died while processing {path}; it is retried on the next start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and extract every resume dropped into it.")
+    parser.add_argument('directory', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads'),
+                        help="Folder to watch (default: uploads/)")
+    parser.add_argument('--export-dir', default=os.path.join(JOBS_FOLDER, 'watch'), help="Folder for the daily CSV exports")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help="Seconds a file must stay unchanged before it is read")
+    parser.add_argument('--poll-interval', type=float, default=5.0, help="Seconds between checks when idle")
+    parser.add_argument('--polling', action='store_true', help="Poll even where inotify is available")
+    parser.add_argument('--rescan-interval', type=float, default=300.0,
+                        help="Seconds between full rescans of the folder with inotify, in case events were lost (0: never)")
+    parser.add_argument('--journal', help="Journal database (default: <export dir>/journal.db)")
+    parser.add_argument('--fields', default='', help="Comma separated fields to extract (default: all)")
+    parser.add_argument('--duplicates-db', default=os.path.join(JOBS_FOLDER, 'duplicates.db'),
+                        help="Near-duplicate index, shared with the web app by default")
+    parser.add_argument('--no-duplicates', action='store_true', help="Skip near-duplicate detection")
+    args = parser.parse_args()
+
+    os.makedirs(args.export_dir, exist_ok=True)
+    try:
+        watch(args.directory, args.export_dir, args.workers, args.settle, args.poll_interval,
+              args.journal or os.path.join(args.export_dir, 'journal.db'), parse_fields([args.fields]),
+              None if args.no_duplicates else args.duplicates_db, args.polling, args.rescan_interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
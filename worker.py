@@ -0,0 +1,69 @@
+"""
+Extraction worker for the work queue (WORK_QUEUE=sqlite in the web app).
+
+Each worker process pulls a task, runs it (process_resume on one uploaded file) and
+posts the rows back to the queue, where the web process picks them up. Start as many
+as the host has cores, on as many hosts as share the jobs folder (same path everywhere).
+
+    WORK_QUEUE=sqlite python app.py
+    python worker.py --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from workqueue import POLL_INTERVAL, SQLiteQueue
+
+DEFAULT_QUEUE = os.path.join(os.getenv("UPLOAD_FOLDER") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs'),
+                             'queue.db')
+
+
+# Function to run tasks from the queue until the process is told to stop
+def work(queue_path, worker):
+    queue = SQLiteQueue(queue_path)
+    stop = threading.Event()
+    # Finish the current task on SIGTERM / Ctrl+C instead of dying half way through it
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    print(f"Worker {worker} waiting for tasks")
+    while not stop.is_set():
+        task = queue.claim(worker)
+        if task is None:
+            stop.wait(POLL_INTERVAL)
+            continue
+        task_id, func, item = task
+        try:
+            result = func(item)
+        except Exception as error:
+            print(f"Task {task_id} failed: {error}")
+            queue.fail(task_id, error)
+        else:
+            queue.complete(task_id, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run extraction workers that pull uploaded files from the work queue.")
+    parser.add_argument('--queue', default=os.getenv("QUEUE_DB") or DEFAULT_QUEUE, help="Queue database shared with the app")
+    parser.add_argument('-p', '--processes', type=int, default=os.cpu_count() or 1, help="Worker processes to start")
+    args = parser.parse_args()
+
+    host = socket.gethostname()
+    processes = [multiprocessing.Process(target=work, args=(args.queue, f"{host}-{number}"))
+                 for number in range(args.processes)]
+    for process in processes:
+        process.start()
+    # A service manager stops the parent only; pass it on so each worker finishes its task and exits
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
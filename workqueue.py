@@ -0,0 +1,240 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+from scheduler import Batch, WorkerCrashed
+
+# A claimed task whose worker has not answered in this many seconds is handed to another worker
+CLAIM_TIMEOUT = int(os.getenv("QUEUE_CLAIM_TIMEOUT", 600))
+MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", 3))
+POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", 0.2))
+# Finished tasks nobody collected (their web process restarted) are dropped after this many seconds
+FINISHED_RETENTION = int(os.getenv("QUEUE_FINISHED_RETENTION", 3600))
+
+
+class TaskFailed(Exception):
+    """A task raised in a worker; the message is the worker's error."""
+
+
+class WorkQueue:
+    """
+    Interface between the web process and extraction workers.
+    Tasks are func(item) calls grouped in batches; the callable and the result travel
+    pickled, as they do to a ProcessPoolExecutor, so workers must run the same code.
+    An external broker (Redis, RabbitMQ, SQS, ...) implements these methods with a task
+    queue plus a result store keyed by batch.
+    """
+
+    def push(self, batch_id, user, func, items):
+        """Queues func(item) for every item of a batch."""
+        raise NotImplementedError
+
+    def claim(self, worker):
+        """Takes the next task for a worker; returns (task_id, func, item) or None when the queue is empty."""
+        raise NotImplementedError
+
+    def complete(self, task_id, result):
+        raise NotImplementedError
+
+    def fail(self, task_id, error):
+        raise NotImplementedError
+
+    def finished(self, batch_ids):
+        """
+        Returns (task_id, batch_id, index, result, error) for every finished task of the batches.
+        error is None, TaskFailed (func raised) or WorkerCrashed (the task kept losing its worker).
+        """
+        raise NotImplementedError
+
+    def acknowledge(self, task_ids):
+        """Deletes finished tasks once their results have been handed to the batch."""
+        raise NotImplementedError
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Work queue kept in a SQLite database, shared by the web process and any number of
+    worker processes on the same host (or on other hosts through shared storage that
+    supports SQLite locking). Workers are served fairly: the next task goes to the user
+    with the fewest tasks running, oldest task first.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    batch_id TEXT,
+                    position INTEGER,
+                    user TEXT,
+                    func BLOB,
+                    item BLOB,
+                    status TEXT,
+                    worker TEXT,
+                    claimed REAL,
+                    finished REAL,
+                    attempts INTEGER DEFAULT 0,
+                    result BLOB,
+                    error TEXT
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, user)")
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_batch ON tasks (batch_id, status)")
+
+    def connect(self):
+        # Short-lived connections, as in JobJournal, so any thread or process can use the queue
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def push(self, batch_id, user, func, items):
+        func = pickle.dumps(func)
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany("INSERT INTO tasks (batch_id, position, user, func, item, status) VALUES (?, ?, ?, ?, ?, 'queued')",
+                           [(batch_id, index, user, func, pickle.dumps(item)) for index, item in enumerate(items)])
+            db.execute("COMMIT")
+
+    def claim(self, worker):
+        now = time.time()
+        with self.connect() as db:
+            # BEGIN IMMEDIATE takes the write lock, so two workers never claim the same task
+            db.execute("BEGIN IMMEDIATE")
+            # Tasks of workers that died mid-task go back to the queue, or are given up after MAX_ATTEMPTS
+            db.execute("UPDATE tasks SET status = 'lost', finished = ?, error = 'Worker stopped responding' "
+                       "WHERE status = 'running' AND claimed < ? AND attempts >= ?",
+                       (now, now - CLAIM_TIMEOUT, MAX_ATTEMPTS))
+            db.execute("UPDATE tasks SET status = 'queued' WHERE status = 'running' AND claimed < ?",
+                       (now - CLAIM_TIMEOUT,))
+            task = db.execute("""
+                SELECT id, func, item FROM tasks
+                WHERE status = 'queued' AND user = (
+                    SELECT user FROM tasks AS queued WHERE status = 'queued' GROUP BY user
+                    ORDER BY (SELECT COUNT(*) FROM tasks WHERE status = 'running' AND user = queued.user), MIN(id)
+                    LIMIT 1)
+                ORDER BY id LIMIT 1""").fetchone()
+            if task is not None:
+                db.execute("UPDATE tasks SET status = 'running', worker = ?, claimed = ?, attempts = attempts + 1 "
+                           "WHERE id = ?", (worker, now, task[0]))
+            db.execute("COMMIT")
+        if task is None:
+            return None
+        task_id, func, item = task
+        return task_id, pickle.loads(func), pickle.loads(item)
+
+    def complete(self, task_id, result):
+        with self.connect() as db:
+            db.execute("UPDATE tasks SET status = 'done', finished = ?, result = ? WHERE id = ? AND status = 'running'",
+                       (time.time(), pickle.dumps(result), task_id))
+
+    def fail(self, task_id, error):
+        with self.connect() as db:
+            db.execute("UPDATE tasks SET status = 'failed', finished = ?, error = ? WHERE id = ? AND status = 'running'",
+                       (time.time(), str(error), task_id))
+
+    def finished(self, batch_ids):
+        if not batch_ids:
+            return []
+        placeholders = ', '.join('?' * len(batch_ids))
+        with self.connect() as db:
+            rows = db.execute(
+                f"SELECT id, batch_id, position, status, result, error FROM tasks "
+                f"WHERE batch_id IN ({placeholders}) AND status IN ('done', 'failed', 'lost')", list(batch_ids)).fetchall()
+        finished = []
+        for task_id, batch_id, position, status, result, error in rows:
+            if status == 'done':
+                try:
+                    finished.append((task_id, batch_id, position, pickle.loads(result), None))
+                except Exception as unpickle_error:
+                    finished.append((task_id, batch_id, position, None, TaskFailed(f"Unreadable result: {unpickle_error}")))
+            else:
+                finished.append((task_id, batch_id, position, None,
+                                 TaskFailed(error) if status == 'failed' else WorkerCrashed(error)))
+        return finished
+
+    def acknowledge(self, task_ids):
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+            db.execute("DELETE FROM tasks WHERE status IN ('done', 'failed', 'lost') AND finished < ?",
+                       (time.time() - FINISHED_RETENTION,))
+            db.execute("COMMIT")
+
+
+class QueueScheduler:
+    """
+    Drop-in replacement for FairScheduler that runs nothing itself: batches are pushed to
+    a WorkQueue and executed by separate worker processes (worker.py), and a collector
+    thread hands their results to the batches' on_result / on_error callbacks.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.batches = {}  # batch_id -> Batch
+        self.delivered = set()  # Tasks handed to their batch but not yet deleted from the queue
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.collect_loop, daemon=True)
+            self.thread.start()
+
+    def submit(self, user, func, items, on_result=None, on_error=None):
+        batch = Batch(user, func, items, on_result, on_error)
+        if batch.items:
+            batch_id = uuid.uuid4().hex
+            with self.lock:
+                self.start()
+                self.batches[batch_id] = batch
+            self.queue.push(batch_id, user, func, batch.items)
+        return batch
+
+    def deliver(self, batch, index, result, error):
+        # A failing callback (e.g. a journal write) must not stop the collector: like FairScheduler,
+        # an on_result error is reported through on_error, and the item always counts as finished
+        if error is None:
+            try:
+                if batch.on_result:
+                    batch.on_result(index, result)
+                batch.finish(index, result=result)
+                return
+            except Exception as callback_error:
+                error = callback_error
+        try:
+            if batch.on_error:
+                batch.on_error(index, error)
+        except Exception as callback_error:
+            print(f"Failed to report an error for item {index} of a batch: {callback_error}")
+        batch.finish(index, error=error)
+
+    def collect_loop(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            with self.lock:
+                batches = dict(self.batches)
+            try:
+                finished = self.queue.finished(list(batches))
+            except Exception as error:
+                print(f"Failed to collect results from the work queue: {error}")
+                continue
+
+            for task_id, batch_id, index, result, error in finished:
+                batch = batches[batch_id]
+                if task_id not in self.delivered:
+                    self.deliver(batch, index, result, error)
+                    self.delivered.add(task_id)
+                    batch.remaining -= 1
+                    if batch.remaining == 0:
+                        with self.lock:
+                            del self.batches[batch_id]
+                        batch.done.set()
+                # Deleted only after the hand-off, so a collector that stops first loses nothing. A failed
+                # deletion is retried on the next poll (or left to FINISHED_RETENTION once the batch is done)
+                try:
+                    self.queue.acknowledge([task_id])
+                    self.delivered.discard(task_id)
+                except Exception as ack_error:
+                    print(f"Failed to acknowledge task {task_id}: {ack_error}")